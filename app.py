@@ -16,6 +16,8 @@ st.set_page_config(
 # Import dependencies
 from models.user import User
 from config.database import init_db
+from services.tracking_poller import start_background_poller
+from services.stock_ledger import start_background_snapshots
 
 # Import views
 import views.dashboard as dashboard
@@ -28,13 +30,17 @@ import views.packages as packages
 import views.invoices as invoices
 import views.purchase_orders as purchase_orders
 
-# Initialize database
+# Initialize database (schema bootstrap runs once per process)
 try:
     init_db()
 except Exception as e:
     st.error(f"Failed to connect to database: {e}")
     st.stop()
 
+# Background package tracking and stock snapshots (start once per process)
+start_background_poller()
+start_background_snapshots()
+
 # Initialize session state for authentication and navigation
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
@@ -218,6 +224,13 @@ def sidebar_navigation():
                 st.rerun()
              # Optional: Add another separator if desired, but "---" is already above. 
         
+        # Query cache hit rates (admins only)
+        if (st.session_state.get('user') or {}).get('role') == 'admin':
+            with st.expander("📈 Cache Stats"):
+                from utils.cache import cache_stats
+                for stat in cache_stats():
+                    st.caption(f"{stat['name']}: {stat['hit_rate']:.0%} of {stat['hits'] + stat['misses']} lookups")
+        
         # Logout Button
         if st.button("🚪 Logout", key="logout", use_container_width=True):
             st.session_state.authenticated = False
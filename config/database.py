@@ -2,7 +2,13 @@
 Database configuration and connection management
 """
 import os
-from pymongo import MongoClient
+import json
+import asyncio
+import hashlib
+import threading
+import weakref
+from datetime import datetime
+from pymongo import AsyncMongoClient, MongoClient
 from pymongo.errors import ConnectionFailure
 from dotenv import load_dotenv
 
@@ -13,72 +19,284 @@ load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "inventory_management")
 
-# Global database connection
-_client = None
-_db = None
+# Named clients so heavy report aggregations cannot starve billing writes
+# of pool connections. Every setting is read from MONGODB_<WORKLOAD>_<NAME>,
+# then MONGODB_<NAME>, then the workload default below.
+WORKLOAD_DEFAULTS = {
+    "oltp": {"MAX_POOL_SIZE": "100", "READ_PREFERENCE": "primary"},
+    "analytics": {"MAX_POOL_SIZE": "10", "READ_PREFERENCE": "secondaryPreferred"},
+}
+
+# Bump when a migration beyond the declared indexes is required
+SCHEMA_VERSION = 1
+
+# Declared index set: collection -> list of (keys, options)
+# Index builds only run when this declaration (or SCHEMA_VERSION) changes
+INDEXES = {
+    'users': [
+        ("username", {"unique": True}),
+        ("email", {"unique": True}),
+    ],
+    'products': [
+        ("sku", {"unique": True}),
+        ("name", {}),
+        ("category", {}),
+        ("quantity", {}),
+        ("is_low_stock", {"partialFilterExpression": {"is_low_stock": True}}),
+        (
+            [("name", "text"), ("sku", "text"), ("category", "text"), ("description", "text")],
+            {"name": "product_text", "weights": {"name": 10, "sku": 8, "category": 4, "description": 1}}
+        ),
+    ],
+    'bills': [
+        ("bill_number", {"unique": True}),
+        ("created_at", {}),
+    ],
+    'suppliers': [
+        ("name", {}),
+    ],
+    'sales_daily': [
+        ([("date", 1), ("product_id", 1)], {}),
+    ],
+    'stock_movements': [
+        ([("product_id", 1), ("timestamp", -1), ("_id", -1)], {}),
+        ([("timestamp", -1), ("_id", -1)], {}),
+    ],
+    'packages': [
+        ([("status", 1), ("created_at", -1), ("_id", -1)], {}),
+        ([("created_at", -1), ("_id", -1)], {}),
+    ],
+    'stock_snapshots': [
+        ([("product_id", 1), ("timestamp", -1)], {}),
+        ([("timestamp", -1)], {}),
+    ],
+    'package_events': [
+        ([("package_id", 1), ("timestamp", -1)], {}),
+    ],
+}
+
+# Global database connections, one client per workload
+_clients = {}
+_databases = {}
+_clients_lock = threading.Lock()
+_supports_transactions = None
+
+# Async clients are bound to the event loop they run on: one per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+# Process-wide schema bootstrap guard
+_schema_ready = False
+_schema_lock = threading.Lock()
 
 
-def get_database():
+def _setting(workload, name):
+    """Client setting for a workload from the environment"""
+    value = os.getenv(f"MONGODB_{workload.upper()}_{name}") or os.getenv(f"MONGODB_{name}")
+    return value if value else WORKLOAD_DEFAULTS.get(workload, {}).get(name)
+
+
+def _client_options(workload):
+    """
+    MongoClient keyword arguments for a workload
+    
+    Settings: MAX_POOL_SIZE, MIN_POOL_SIZE, MAX_IDLE_TIME_MS,
+    READ_PREFERENCE, WRITE_CONCERN (w, e.g. "majority" or "1"),
+    COMPRESSORS (e.g. "zstd,snappy"), RETRY_WRITES ("true"/"false")
+    """
+    options = {"serverSelectionTimeoutMS": 5000, "appname": f"vaultly-{workload}"}
+    
+    for name, option in (("MAX_POOL_SIZE", "maxPoolSize"), ("MIN_POOL_SIZE", "minPoolSize"), ("MAX_IDLE_TIME_MS", "maxIdleTimeMS")):
+        value = _setting(workload, name)
+        if value:
+            options[option] = int(value)
+    
+    read_preference = _setting(workload, "READ_PREFERENCE")
+    if read_preference:
+        options["readPreference"] = read_preference
+    
+    write_concern = _setting(workload, "WRITE_CONCERN")
+    if write_concern:
+        options["w"] = int(write_concern) if write_concern.isdigit() else write_concern
+    
+    compressors = _setting(workload, "COMPRESSORS")
+    if compressors:
+        # zstd and snappy need the zstandard / python-snappy packages
+        options["compressors"] = compressors
+    
+    retry_writes = _setting(workload, "RETRY_WRITES")
+    if retry_writes:
+        options["retryWrites"] = retry_writes.lower() in ("1", "true", "yes")
+    
+    return options
+
+
+def get_database(workload="oltp"):
     """
     Get MongoDB database instance with connection pooling
+    
+    Args:
+        workload: "oltp" for application reads and writes, "analytics"
+                  for reports and dashboards (smaller pool, reads from
+                  secondaries when available)
+    
     Returns the database object
     """
-    global _client, _db
+    db = _databases.get(workload)
+    if db is not None:
+        return db
+    
+    with _clients_lock:
+        if workload not in _databases:
+            uri = os.getenv(f"MONGODB_{workload.upper()}_URI") or MONGODB_URI
+            try:
+                client = MongoClient(uri, **_client_options(workload))
+                # Test connection
+                client.admin.command('ping')
+                _clients[workload] = client
+                _databases[workload] = client[DATABASE_NAME]
+                print(f"✅ Connected to MongoDB: {DATABASE_NAME} ({workload})")
+            except ConnectionFailure as e:
+                print(f"❌ Failed to connect to MongoDB: {e}")
+                raise
     
-    if _db is None:
+    return _databases[workload]
+
+
+def get_async_database():
+    """
+    Get the async database for the running event loop
+    Must be called from inside a coroutine
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncMongoClient(MONGODB_URI, **_client_options("oltp"))
+        _async_clients[loop] = client
+    return client[DATABASE_NAME]
+
+
+async def close_async_connection():
+    """
+    Close the async client of the running event loop
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def get_client(workload="oltp"):
+    """
+    Get the shared MongoClient for a workload (connects on first use)
+    """
+    get_database(workload)
+    return _clients[workload]
+
+
+def supports_transactions():
+    """
+    Check whether the deployment supports multi-document transactions
+    (replica set or sharded cluster). Cached for the process lifetime.
+    """
+    global _supports_transactions
+    
+    if _supports_transactions is None:
         try:
-            _client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-            # Test connection
-            _client.admin.command('ping')
-            _db = _client[DATABASE_NAME]
-            print(f"✅ Connected to MongoDB: {DATABASE_NAME}")
-        except ConnectionFailure as e:
-            print(f"❌ Failed to connect to MongoDB: {e}")
-            raise
+            hello = get_client().admin.command('hello')
+            _supports_transactions = bool(hello.get('setName')) or hello.get('msg') == 'isdbgrid'
+        except Exception:
+            _supports_transactions = False
     
-    return _db
+    return _supports_transactions
 
 
-def init_db():
+def run_in_transaction(callback):
+    """
+    Run callback(session) inside a transaction when supported
+    
+    On standalone servers the callback runs without a session
+    (callback(None)), so callers must pass the session through to
+    every operation and tolerate it being None.
+    
+    Returns:
+        Whatever the callback returns
+    """
+    if not supports_transactions():
+        return callback(None)
+    
+    with get_client().start_session() as session:
+        return session.with_transaction(callback)
+
+
+def _schema_fingerprint():
+    """Hash of the schema version and declared index set"""
+    spec = json.dumps({"version": SCHEMA_VERSION, "indexes": INDEXES}, sort_keys=True)
+    return hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+
+def init_db(force=False):
     """
     Initialize database with indexes for optimized queries
+    
+    Runs at most once per process. Index builds are skipped when the
+    stored schema fingerprint already matches the declared index set,
+    so Streamlit reruns do not re-issue create_index commands.
+    
+    Args:
+        force: Rebuild indexes even if the stored schema is current
     """
-    db = get_database()
+    global _schema_ready
     
-    # Create indexes for better performance
-    try:
-        # Users collection
-        db.users.create_index("username", unique=True)
-        db.users.create_index("email", unique=True)
-        
-        # Products collection
-        db.products.create_index("sku", unique=True)
-        db.products.create_index("name")
-        db.products.create_index("category")
-        db.products.create_index("quantity")
+    if _schema_ready and not force:
+        return
+    
+    with _schema_lock:
+        if _schema_ready and not force:
+            return
         
-        # Bills collection
-        db.bills.create_index("bill_number", unique=True)
-        db.bills.create_index("created_at")
+        db = get_database()
+        fingerprint = _schema_fingerprint()
+        meta = db[COLLECTIONS['schema_meta']].find_one({"_id": "schema"})
         
-        # Suppliers collection
-        db.suppliers.create_index("name")
+        if force or not meta or meta.get('fingerprint') != fingerprint:
+            try:
+                for collection, indexes in INDEXES.items():
+                    for keys, options in indexes:
+                        db[collection].create_index(keys, **options)
+                
+                db[COLLECTIONS['schema_meta']].update_one(
+                    {"_id": "schema"},
+                    {
+                        "$set": {
+                            "version": SCHEMA_VERSION,
+                            "fingerprint": fingerprint,
+                            "updated_at": datetime.now()
+                        }
+                    },
+                    upsert=True
+                )
+                print(f"✅ Database schema v{SCHEMA_VERSION} indexes created successfully")
+            except Exception as e:
+                # Leave the guard unset so the next call retries
+                print(f"⚠️ Warning: Could not create indexes: {e}")
+                return
         
-        print("✅ Database indexes created successfully")
-    except Exception as e:
-        print(f"⚠️ Warning: Could not create indexes: {e}")
+        _schema_ready = True
 
 
 def close_connection():
     """
     Close MongoDB connection
     """
-    global _client, _db
-    if _client:
-        _client.close()
-        _client = None
-        _db = None
-        print("✅ MongoDB connection closed")
+    global _schema_ready, _supports_transactions
+    with _clients_lock:
+        if _clients:
+            for client in _clients.values():
+                client.close()
+            _clients.clear()
+            _databases.clear()
+            _schema_ready = False
+            _supports_transactions = None
+            print("✅ MongoDB connection closed")
 
 
 # Collection names
@@ -90,5 +308,11 @@ COLLECTIONS = {
     'suppliers': 'suppliers',
     'packages': 'packages',
     'transfers': 'transfers',
-    'stock_movements': 'stock_movements'
+    'stock_movements': 'stock_movements',
+    'sales_daily': 'sales_daily',
+    'tracking_cache': 'tracking_cache',
+    'package_events': 'package_events',
+    'counters': 'counters',
+    'stock_snapshots': 'stock_snapshots',
+    'schema_meta': 'schema_meta'
 }
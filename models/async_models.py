@@ -0,0 +1,242 @@
+"""
+Async model layer on PyMongo's AsyncMongoClient
+Mirrors the read paths and main writes of the sync models so background
+workers, report jobs and context builders can overlap queries with
+asyncio.gather. Documents are built by the same helpers as the sync
+models, so both layers read and write identical schemas.
+
+Example:
+    products, low_stock = await asyncio.gather(
+        AsyncProduct.get_all_products(limit=30),
+        AsyncProduct.get_low_stock_items()
+    )
+"""
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+from config.database import get_async_database
+from models.bill import Bill, BILL_SEQUENCE
+from models.counter import Counter
+from models.product import Product, SKU_SEQUENCE
+from models.sales_rollup import SalesRollup
+from services.search_service import ProductSearch
+from utils.cache import notify_change
+from utils.pagination import keyset_sort, next_cursor
+
+
+class AsyncCounter:
+    """Async counterpart of Counter (one $inc per number, no blocks)"""
+
+    @staticmethod
+    async def next_number(prefix, name, daily=True, width=4):
+        """Allocate a formatted document number"""
+        db = get_async_database()
+        day = datetime.now() if daily else None
+        doc = await db.counters.find_one_and_update(
+            {"_id": Counter.sequence_key(name, day)},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return Counter.format_number(prefix, doc['seq'], day, width)
+
+
+class AsyncProduct:
+    """Async counterpart of Product"""
+
+    @staticmethod
+    async def create_product(name, description, category, quantity, unit, price, cost, reorder_level, supplier_id=None):
+        """
+        Create a new product and log its initial stock
+
+        Returns:
+            Product ID
+        """
+        db = get_async_database()
+
+        sku = await AsyncCounter.next_number("PRD", **SKU_SEQUENCE)
+        product_doc = Product._product_doc(
+            sku, name, description, category, quantity,
+            unit, price, cost, reorder_level, supplier_id
+        )
+
+        result = await db.products.insert_one(product_doc)
+        await db.stock_movements.insert_one(
+            Product._movement_doc(str(result.inserted_id), quantity, "initial_stock", "Initial stock added", cost)
+        )
+        ProductSearch.index_product(product_doc)
+        notify_change("products")
+        return str(result.inserted_id)
+
+    @staticmethod
+    async def get_all_products(filters=None, limit=0):
+        """Get all products with optional filters and limit (0 = no limit)"""
+        db = get_async_database()
+        return await db.products.find(filters or {}).limit(limit).to_list()
+
+    @staticmethod
+    async def list_products(fields=None, filters=None, sort="name", limit=0, after=None):
+        """
+        List products with a projection and keyset pagination
+
+        Returns:
+            (products, next_cursor) - next_cursor is None on the last page
+        """
+        db = get_async_database()
+        query, projection = Product._list_query(fields, filters, sort, after)
+        products = await db.products.find(query, projection).sort(keyset_sort(sort, 1)).limit(limit).to_list()
+        return products, next_cursor(products, sort, limit) if limit else None
+
+    @staticmethod
+    async def count_products():
+        """Approximate product count from collection metadata"""
+        db = get_async_database()
+        return await db.products.estimated_document_count()
+
+    @staticmethod
+    async def get_product_by_id(product_id):
+        """Get product by ID"""
+        db = get_async_database()
+        return await db.products.find_one({"_id": ObjectId(product_id)})
+
+    @staticmethod
+    async def get_product_by_sku(sku):
+        """Get product by SKU"""
+        db = get_async_database()
+        return await db.products.find_one({"sku": sku})
+
+    @staticmethod
+    async def get_low_stock_items():
+        """Get products at or below their reorder level"""
+        db = get_async_database()
+        return await db.products.find({"is_low_stock": True}).to_list()
+
+    @staticmethod
+    async def get_categories():
+        """Get all unique categories"""
+        db = get_async_database()
+        return await db.products.distinct("category")
+
+    @staticmethod
+    async def update_stock(product_id, quantity_change, movement_type="adjustment", notes=""):
+        """
+        Apply a guarded stock change and log the movement
+
+        Unlike Product.update_stock the movement is written after the
+        product update rather than in a shared transaction.
+
+        Returns:
+            New stock quantity, or None if the product does not exist or
+            the change would make stock negative
+        """
+        db = get_async_database()
+        product = await db.products.find_one_and_update(
+            Product._stock_guard(product_id, quantity_change),
+            Product._stock_pipeline(quantity_change),
+            projection={"stock": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not product:
+            return None
+
+        await db.stock_movements.insert_one(
+            Product._movement_doc(product_id, quantity_change, movement_type, notes)
+        )
+        notify_change("products")
+        return product['stock']
+
+    @staticmethod
+    async def get_stock_movements(product_id=None, limit=50):
+        """Get stock movement history, newest first"""
+        db = get_async_database()
+        query = {"product_id": ObjectId(product_id)} if product_id else {}
+        return await db.stock_movements.find(query).sort(keyset_sort("timestamp")).limit(limit).to_list()
+
+
+class AsyncBill:
+    """Async counterpart of Bill"""
+
+    @staticmethod
+    async def create_bill(customer_name, customer_contact, items, tax_rate=0.18, discount=0, created_by=None):
+        """
+        Create a new bill and add it to the sales rollup
+
+        Returns:
+            Bill ID
+        """
+        db = get_async_database()
+
+        # Store each line's category so removing the bill later hits the same rollup rows
+        ids = [ObjectId(item['product_id']) for item in items if ObjectId.is_valid(str(item.get('product_id')))]
+        categories = {
+            str(p['_id']): p.get('category', 'Uncategorized')
+            async for p in db.products.find({"_id": {"$in": ids}}, {"category": 1})
+        }
+        items = [
+            {**item, "category": categories.get(str(item.get('product_id')), "Uncategorized")}
+            for item in items
+        ]
+
+        bill_doc = Bill._bill_doc(
+            await AsyncCounter.next_number(**BILL_SEQUENCE), customer_name, customer_contact,
+            items, tax_rate, discount, created_by
+        )
+        result = await db.bills.insert_one(bill_doc)
+        await db.sales_daily.bulk_write(SalesRollup.build_ops(bill_doc, categories), ordered=False)
+
+        notify_change("bills")
+        return str(result.inserted_id)
+
+    @staticmethod
+    async def get_all_bills(limit=100):
+        """Get all bills, newest first"""
+        db = get_async_database()
+        return await db.bills.find().sort("created_at", -1).limit(limit).to_list()
+
+    @staticmethod
+    async def get_bill_by_id(bill_id):
+        """Get bill by ID"""
+        db = get_async_database()
+        return await db.bills.find_one({"_id": ObjectId(bill_id)})
+
+    @staticmethod
+    async def get_bill_by_number(bill_number):
+        """Get bill by bill number"""
+        db = get_async_database()
+        return await db.bills.find_one({"bill_number": bill_number})
+
+    @staticmethod
+    async def get_bills_by_date_range(start_date, end_date):
+        """Get bills within date range"""
+        db = get_async_database()
+        return await db.bills.find({
+            "created_at": {"$gte": start_date, "$lte": end_date}
+        }).sort("created_at", -1).to_list()
+
+    @staticmethod
+    async def get_sales_totals(start_date=None, end_date=None):
+        """
+        Revenue, units and bill count over whole days (from the rollup)
+
+        Returns:
+            Dict with revenue, units, bill_count
+        """
+        db = get_async_database()
+        cursor = await db.sales_daily.aggregate(SalesRollup.totals_pipeline(start_date, end_date))
+        return SalesRollup.totals_result(await cursor.to_list())
+
+
+class AsyncSupplier:
+    """Async counterpart of Supplier"""
+
+    @staticmethod
+    async def get_all_suppliers():
+        """Get all suppliers"""
+        db = get_async_database()
+        return await db.suppliers.find().to_list()
+
+    @staticmethod
+    async def get_supplier_by_id(supplier_id):
+        """Get supplier by ID"""
+        db = get_async_database()
+        return await db.suppliers.find_one({"_id": ObjectId(supplier_id)})
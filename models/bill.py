@@ -4,7 +4,13 @@ Bill model for invoice generation and management
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_database
-import random
+from models.counter import Counter
+from models.sales_rollup import SalesRollup
+from utils.cache import notify_change
+
+# Counter sequence for bill numbers; 5 digits so new numbers never clash
+# with older random 4-digit ones
+BILL_SEQUENCE = {"prefix": "INV", "name": "bill", "width": 5}
 
 
 class Bill:
@@ -12,10 +18,29 @@ class Bill:
     
     @staticmethod
     def generate_bill_number():
-        """Generate unique bill number"""
-        timestamp = datetime.now().strftime("%Y%m%d")
-        random_part = random.randint(1000, 9999)
-        return f"INV-{timestamp}-{random_part}"
+        """Allocate the next bill number for today (INV-YYYYMMDD-00001)"""
+        return Counter.next_number(**BILL_SEQUENCE)
+    
+    @staticmethod
+    def _bill_doc(bill_number, customer_name, customer_contact, items, tax_rate=0.18, discount=0, created_by=None):
+        """Build a new bill document with computed totals"""
+        subtotal = sum(item['total'] for item in items)
+        tax = subtotal * tax_rate
+        total = subtotal + tax - discount
+        
+        return {
+            "bill_number": bill_number,
+            "customer_name": customer_name,
+            "customer_contact": customer_contact,
+            "items": items,
+            "subtotal": round(subtotal, 2),
+            "tax_rate": tax_rate,
+            "tax": round(tax, 2),
+            "discount": round(discount, 2),
+            "total": round(total, 2),
+            "created_at": datetime.now(),
+            "created_by": ObjectId(created_by) if created_by else None
+        }
     
     @staticmethod
     def create_bill(customer_name, customer_contact, items, tax_rate=0.18, discount=0, created_by=None):
@@ -35,31 +60,14 @@ class Bill:
         """
         db = get_database()
         
-        # Generate unique bill number
-        bill_number = Bill.generate_bill_number()
-        while db.bills.find_one({"bill_number": bill_number}):
-            bill_number = Bill.generate_bill_number()
-        
-        # Calculate totals
-        subtotal = sum(item['total'] for item in items)
-        tax = subtotal * tax_rate
-        total = subtotal + tax - discount
-        
-        bill_doc = {
-            "bill_number": bill_number,
-            "customer_name": customer_name,
-            "customer_contact": customer_contact,
-            "items": items,
-            "subtotal": round(subtotal, 2),
-            "tax_rate": tax_rate,
-            "tax": round(tax, 2),
-            "discount": round(discount, 2),
-            "total": round(total, 2),
-            "created_at": datetime.now(),
-            "created_by": ObjectId(created_by) if created_by else None
-        }
+        bill_doc = Bill._bill_doc(
+            Bill.generate_bill_number(), customer_name, customer_contact,
+            SalesRollup.with_categories(items), tax_rate, discount, created_by
+        )
         
         result = db.bills.insert_one(bill_doc)
+        SalesRollup.apply_bill(bill_doc)
+        notify_change("bills")
         return str(result.inserted_id)
     
     @staticmethod
@@ -107,13 +115,34 @@ class Bill:
     def delete_bill(bill_id):
         """Delete bill"""
         db = get_database()
-        return db.bills.delete_one({"_id": ObjectId(bill_id)})
+        bill = db.bills.find_one_and_delete({"_id": ObjectId(bill_id)})
+        if bill:
+            SalesRollup.apply_bill(bill, sign=-1)
+            notify_change("bills")
+        return bill is not None
+    
+    @staticmethod
+    def rebuild_sales_rollup(include_today=False):
+        """Regenerate the sales_daily rollup from raw bills"""
+        return SalesRollup.rebuild(include_today=include_today)
     
     @staticmethod
     def get_total_sales(start_date=None, end_date=None):
-        """Calculate total sales"""
+        """
+        Calculate total sales
+        
+        Served from the daily rollup when the range covers whole days;
+        partial-day ranges aggregate the raw bills.
+        """
         db = get_database()
         
+        whole_days = (
+            not (start_date and end_date)
+            or (start_date.time() == datetime.min.time() and end_date.time() == datetime.max.time())
+        )
+        if whole_days:
+            return SalesRollup.get_totals(start_date, end_date)['revenue']
+        
         query = {}
         if start_date and end_date:
             query["created_at"] = {"$gte": start_date, "$lte": end_date}
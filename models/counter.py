@@ -0,0 +1,88 @@
+"""
+Counter model for sequential document numbers
+One document per sequence in the counters collection; each allocation is
+a single atomic $inc, so numbers never collide across processes.
+"""
+import os
+import threading
+from datetime import datetime
+from pymongo import ReturnDocument
+from config.database import get_database
+
+# Numbers reserved per round trip. 1 keeps numbers gapless and in order;
+# larger blocks save round trips but leave gaps when a process exits and
+# interleave numbers between processes.
+BLOCK_SIZE = max(1, int(os.getenv("COUNTER_BLOCK_SIZE", 1)))
+
+
+class Counter:
+    """Atomic sequences per document type (optionally per day)"""
+    
+    _blocks = {}  # sequence key -> [next value, last reserved value]
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def _reserve(key, count):
+        """
+        Atomically reserve `count` values of a sequence
+        
+        Returns:
+            First value of the reserved block
+        """
+        db = get_database()
+        doc = db.counters.find_one_and_update(
+            {"_id": key},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc['seq'] - count + 1
+    
+    @staticmethod
+    def sequence_key(name, day=None):
+        """Counter _id for a sequence (per day when `day` is given)"""
+        return f"{name}|{day.strftime('%Y%m%d')}" if day else name
+    
+    @staticmethod
+    def format_number(prefix, value, day=None, width=4):
+        """Format a sequence value as a document number"""
+        if day:
+            return f"{prefix}-{day.strftime('%Y%m%d')}-{value:0{width}d}"
+        return f"{prefix}-{value:0{width}d}"
+    
+    @staticmethod
+    def next_value(name, day=None):
+        """
+        Allocate the next value of a sequence
+        
+        Args:
+            name: Sequence name (e.g. "bill")
+            day: Date for per-day sequences, None for a global sequence
+        
+        Returns:
+            Integer starting at 1
+        """
+        key = Counter.sequence_key(name, day)
+        
+        if BLOCK_SIZE == 1:
+            return Counter._reserve(key, 1)
+        
+        with Counter._lock:
+            block = Counter._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                start = Counter._reserve(key, BLOCK_SIZE)
+                block = Counter._blocks[key] = [start, start + BLOCK_SIZE - 1]
+            value = block[0]
+            block[0] += 1
+            return value
+    
+    @staticmethod
+    def next_number(prefix, name, daily=True, width=4):
+        """
+        Allocate a formatted document number
+        
+        Examples: next_number("SO", "sales_order") -> "SO-20250101-0001",
+        next_number("PRD", "sku", daily=False, width=6) -> "PRD-000001"
+        """
+        day = datetime.now() if daily else None
+        return Counter.format_number(prefix, Counter.next_value(name, day), day, width)
@@ -5,17 +5,30 @@ Invoice model for managing customer invoices
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_database
+from models.counter import Counter
+from utils.cache import notify_change
+
+# Counter sequence for invoice numbers; bills already use INV, so invoices
+# get their own prefix and the two can never be confused
+INVOICE_SEQUENCE = {"prefix": "SI", "name": "invoice"}
 
 class Invoice:
     """Invoice model"""
     
+    @staticmethod
+    def generate_invoice_number():
+        """Allocate the next invoice number for today (SI-YYYYMMDD-0001)"""
+        return Counter.next_number(**INVOICE_SEQUENCE)
+    
     @staticmethod
     def create_invoice(invoice_number, customer_name, invoice_date, due_date, items, 
                        tax_rate=0.0, status="Draft", notes="", sales_order_id=None, created_by=None):
         """
         Create a new invoice
+        An invoice number is allocated when invoice_number is blank
         """
         db = get_database()
+        invoice_number = invoice_number or Invoice.generate_invoice_number()
         
         # Calculate totals
         subtotal = sum(item['total'] for item in items)
@@ -41,6 +54,7 @@ class Invoice:
         }
         
         result = db.invoices.insert_one(invoice_doc)
+        notify_change("invoices")
         return str(result.inserted_id)
     
     @staticmethod
@@ -68,3 +82,4 @@ class Invoice:
                 }
             }
         )
+        notify_change("invoices")
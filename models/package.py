@@ -5,6 +5,24 @@ Package model for shipment tracking
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_database
+from utils.cache import notify_change
+from utils.pagination import keyset_filter, keyset_sort, next_cursor
+
+# Statuses after which a package is no longer polled
+FINAL_STATUSES = ("Delivered", "Expired")
+
+# Fields rendered by the package list; history lives in package_events
+SUMMARY_FIELDS = {
+    "tracking_number": 1,
+    "carrier": 1,
+    "status": 1,
+    "destination": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "last_event": 1,
+    "last_checked_at": 1,
+    "estimated_delivery": 1
+}
 
 class Package:
     """Package model"""
@@ -24,41 +42,110 @@ class Package:
             "notes": notes,
             "created_at": datetime.now(),
             "updated_at": datetime.now(),
-            "created_by": ObjectId(created_by) if created_by else None,
-            "tracking_history": []
+            "created_by": ObjectId(created_by) if created_by else None
         }
         
         result = db.packages.insert_one(package_doc)
+        notify_change("packages")
         return str(result.inserted_id)
     
     @staticmethod
     def get_all_packages(limit=100):
-        """Get all packages"""
+        """Get all packages (summary fields only)"""
+        db = get_database()
+        return list(db.packages.find({}, SUMMARY_FIELDS).sort("created_at", -1).limit(limit))
+    
+    @staticmethod
+    def list_packages(status=None, after=None, page_size=25):
+        """
+        Get one page of packages, newest first
+        
+        Args:
+            status: Only packages with this status
+            after: Cursor from a previous page
+            page_size: Packages per page
+        
+        Returns:
+            (packages, next_cursor) - next_cursor is None on the last page
+        """
+        db = get_database()
+        query = {"status": status} if status else {}
+        if after:
+            query = {**query, **keyset_filter("created_at", after)}
+        
+        packages = list(db.packages.find(query, SUMMARY_FIELDS).sort(keyset_sort("created_at")).limit(page_size))
+        return packages, next_cursor(packages, "created_at", page_size)
+    
+    @staticmethod
+    def get_status_counts():
+        """
+        Count packages per status
+        
+        Returns:
+            Dict of status -> count
+        """
+        db = get_database()
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {row['_id']: row['count'] for row in db.packages.aggregate(pipeline)}
+    
+    @staticmethod
+    def get_packages_to_track(limit=0):
+        """Get packages that have not reached a final status"""
         db = get_database()
-        return list(db.packages.find().sort("created_at", -1).limit(limit))
+        return list(db.packages.find(
+            {"status": {"$nin": list(FINAL_STATUSES)}},
+            {"tracking_number": 1, "carrier": 1, "status": 1, "last_event": 1}
+        ).limit(limit))
     
     @staticmethod
-    def update_status(package_id, status, location=None, details=None):
+    def update_status(package_id, status, location=None, details=None, estimated_delivery=None):
         """Update package status"""
         db = get_database()
         
         update_doc = {
             "status": status,
-            "updated_at": datetime.now()
+            "updated_at": datetime.now(),
+            "last_checked_at": datetime.now()
         }
+        if estimated_delivery:
+            update_doc["estimated_delivery"] = estimated_delivery
         
-        # Add to history
+        # History is kept in package_events; the package only holds the latest event
         history_entry = {
             "status": status,
             "location": location,
             "details": details,
             "timestamp": datetime.now()
         }
+        update_doc["last_event"] = history_entry
         
-        db.packages.update_one(
-            {"_id": ObjectId(package_id)},
-            {
-                "$set": update_doc,
-                "$push": {"tracking_history": history_entry}
-            }
+        db.packages.update_one({"_id": ObjectId(package_id)}, {"$set": update_doc})
+        db.package_events.insert_one({"package_id": ObjectId(package_id), **history_entry})
+        notify_change("packages")
+    
+    @staticmethod
+    def get_events(package_id, limit=50):
+        """
+        Get recorded status updates for a package
+        
+        Args:
+            package_id: Package ID
+            limit: Maximum number of events
+        
+        Returns:
+            List of events, newest first
+        """
+        db = get_database()
+        return list(db.package_events.find(
+            {"package_id": ObjectId(package_id)},
+            {"_id": 0, "package_id": 0}
+        ).sort("timestamp", -1).limit(limit))
+    
+    @staticmethod
+    def mark_checked(package_ids):
+        """Record a tracking check that found no change"""
+        db = get_database()
+        db.packages.update_many(
+            {"_id": {"$in": [ObjectId(pid) for pid in package_ids]}},
+            {"$set": {"last_checked_at": datetime.now()}}
         )
@@ -4,9 +4,40 @@ Includes category management within the same model
 """
 from datetime import datetime
 from bson import ObjectId
-from config.database import get_database
-import random
-import string
+from pymongo import ReturnDocument, UpdateOne
+from config.database import get_database, run_in_transaction
+from models.counter import Counter
+from services.search_service import ProductSearch
+from utils.pagination import keyset_filter, keyset_sort, next_cursor
+from utils.cache import cached_query, notify_change
+
+
+# Current stock level; legacy documents may only carry 'quantity'
+CURRENT_STOCK = {"$ifNull": ["$stock", {"$ifNull": ["$quantity", 0]}]}
+
+# Counter sequence for SKUs; numeric SKUs cannot clash with older random
+# 8-character ones
+SKU_SEQUENCE = {"name": "sku", "daily": False, "width": 6}
+
+# Effective reorder threshold: the computed reorder point when the
+# planner has set one, otherwise the manual reorder level
+REORDER_THRESHOLD = {"$ifNull": ["$reorder_point", {"$ifNull": ["$reorder_level", 0]}]}
+
+# Recomputes the materialized low-stock flag; append after any update
+# stage that changes stock or reorder levels
+LOW_STOCK_STAGE = {
+    "$set": {
+        "is_low_stock": {"$lte": [CURRENT_STOCK, REORDER_THRESHOLD]}
+    }
+}
+
+
+class InsufficientStockError(Exception):
+    """Raised when a batch stock change would make stock negative"""
+    
+    def __init__(self, product_ids):
+        self.product_ids = product_ids
+        super().__init__(f"Insufficient stock for product(s): {', '.join(product_ids)}")
 
 
 class Product:
@@ -14,9 +45,67 @@ class Product:
     
     @staticmethod
     def generate_sku(prefix="PRD"):
-        """Generate unique SKU"""
-        random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-        return f"{prefix}-{random_part}"
+        """Allocate the next SKU (PRD-000001)"""
+        return Counter.next_number(prefix, **SKU_SEQUENCE)
+    
+    @staticmethod
+    def _product_doc(sku, name, description, category, quantity, unit, price, cost, reorder_level, supplier_id=None):
+        """Build a new product document"""
+        return {
+            "sku": sku,
+            "name": name,
+            "description": description,
+            "category": category,
+            "stock": quantity,
+            "quantity": quantity,
+            "is_low_stock": quantity <= reorder_level,
+            "unit": unit,
+            "price": float(price),
+            "cost": float(cost),
+            "reorder_level": reorder_level,
+            "supplier_id": supplier_id,
+            "created_at": datetime.now(),
+            "updated_at": datetime.now()
+        }
+    
+    @staticmethod
+    def _stock_guard(product_id, quantity_change):
+        """Filter matching a product only if the change keeps stock >= 0"""
+        return {
+            "_id": ObjectId(product_id),
+            "$expr": {"$gte": [{"$add": [CURRENT_STOCK, quantity_change]}, 0]}
+        }
+    
+    @staticmethod
+    def _stock_pipeline(quantity_change, **extra):
+        """Update pipeline applying a stock change to both stock fields"""
+        new_quantity = {"$add": [CURRENT_STOCK, quantity_change]}
+        return [
+            {
+                "$set": {
+                    "stock": new_quantity,
+                    "quantity": new_quantity,
+                    **extra,
+                    "updated_at": datetime.now()
+                }
+            },
+            LOW_STOCK_STAGE
+        ]
+    
+    @staticmethod
+    def _list_query(fields=None, filters=None, sort="name", after=None):
+        """Query and projection for list_products"""
+        query = dict(filters or {})
+        if after:
+            query = {"$and": [query, keyset_filter(sort, after, 1)]} if query else keyset_filter(sort, after, 1)
+        
+        projection = None
+        if fields is not None:
+            projection = {field: 1 for field in fields}
+            projection[sort] = 1
+            if "stock" in projection:
+                projection["stock"] = CURRENT_STOCK
+        return query, projection
     
     @staticmethod
     def create_product(name, description, category, quantity, unit, price, cost, reorder_level, supplier_id=None):
@@ -39,44 +128,63 @@ class Product:
         """
         db = get_database()
         
-        # Generate unique SKU
-        sku = Product.generate_sku()
-        while db.products.find_one({"sku": sku}):
-            sku = Product.generate_sku()
-        
-        product_doc = {
-            "sku": sku,
-            "name": name,
-            "description": description,
-            "category": category,
-            "quantity": quantity,
-            "unit": unit,
-            "price": float(price),
-            "cost": float(cost),
-            "reorder_level": reorder_level,
-            "supplier_id": supplier_id,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        }
+        product_doc = Product._product_doc(
+            Product.generate_sku(), name, description, category, quantity,
+            unit, price, cost, reorder_level, supplier_id
+        )
         
         result = db.products.insert_one(product_doc)
+        ProductSearch.refresh_product(result.inserted_id)
+        notify_change("products")
         
         # Log stock movement
         Product.log_stock_movement(
             str(result.inserted_id),
             quantity,
             "initial_stock",
-            "Initial stock added"
+            "Initial stock added",
+            unit_cost=cost
         )
         
         return str(result.inserted_id)
     
     @staticmethod
-    def get_all_products(filters=None):
-        """Get all products with optional filters"""
+    @cached_query(ttl=30, topics=("products",))
+    def get_all_products(filters=None, limit=0):
+        """Get all products with optional filters and limit (0 = no limit)"""
         db = get_database()
         query = filters if filters else {}
-        return list(db.products.find(query))
+        return list(db.products.find(query).limit(limit))
+    
+    @staticmethod
+    @cached_query(ttl=30, topics=("products",))
+    def list_products(fields=None, filters=None, sort="name", limit=0, after=None):
+        """
+        List products with a projection and keyset pagination
+        
+        Args:
+            fields: Field names to return (None = whole documents). "stock"
+                    is resolved from stock/quantity on the server.
+            filters: MongoDB query
+            sort: Field to order by (ascending, _id breaks ties)
+            limit: Page size (0 = no limit)
+            after: Cursor from a previous page
+        
+        Returns:
+            (products, next_cursor) - next_cursor is None on the last page
+        """
+        db = get_database()
+        query, projection = Product._list_query(fields, filters, sort, after)
+        
+        products = list(db.products.find(query, projection).sort(keyset_sort(sort, 1)).limit(limit))
+        return products, next_cursor(products, sort, limit) if limit else None
+    
+    @staticmethod
+    @cached_query(ttl=60, topics=("products",))
+    def count_products():
+        """Approximate product count from collection metadata"""
+        db = get_database()
+        return db.products.estimated_document_count()
     
     @staticmethod
     def get_product_by_id(product_id):
@@ -92,19 +200,55 @@ class Product:
     
     @staticmethod
     def update_product(product_id, updates):
-        """Update product information"""
+        """
+        Update product information
+        
+        A stock edit is logged as an adjustment movement for the
+        difference, so the movement ledger stays complete.
+        
+        Returns:
+            True if the product exists
+        """
         db = get_database()
         updates['updated_at'] = datetime.now()
-        return db.products.update_one(
+        
+        # Keep both stock field names in step
+        if 'stock' in updates and 'quantity' not in updates:
+            updates['quantity'] = updates['stock']
+        elif 'quantity' in updates and 'stock' not in updates:
+            updates['stock'] = updates['quantity']
+        
+        before = db.products.find_one_and_update(
             {"_id": ObjectId(product_id)},
-            {"$set": updates}
+            [
+                {"$set": {field: {"$literal": value} for field, value in updates.items()}},
+                LOW_STOCK_STAGE
+            ],
+            projection={"stock": CURRENT_STOCK},
+            return_document=ReturnDocument.BEFORE
         )
+        if before is None:
+            return False
+        
+        if 'stock' in updates and updates['stock'] != before['stock']:
+            Product.log_stock_movement(
+                product_id, updates['stock'] - before['stock'], "adjustment", "Stock edited"
+            )
+        
+        ProductSearch.refresh_product(product_id)
+        notify_change("products")
+        return True
     
     @staticmethod
     def update_stock(product_id, quantity_change, movement_type="adjustment", notes=""):
         """
         Update product stock quantity
         
+        The change is applied atomically with a guarded pipeline update,
+        so concurrent sales cannot lose updates or drive stock negative.
+        The stock movement is written in the same transaction when the
+        deployment supports transactions.
+        
         Args:
             product_id: Product ID
             quantity_change: Change in quantity (positive or negative)
@@ -112,107 +256,270 @@ class Product:
             notes: Optional notes
         
         Returns:
-            True if successful, False otherwise
+            New stock quantity if successful, None if the product does not
+            exist or the change would make stock negative
         """
         db = get_database()
         
-        product = Product.get_product_by_id(product_id)
-        if not product:
-            return False
+        def apply(session):
+            # Update both fields to ensure consistency; cannot go negative
+            product = db.products.find_one_and_update(
+                Product._stock_guard(product_id, quantity_change),
+                Product._stock_pipeline(quantity_change),
+                projection={"stock": 1},
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
+            if not product:
+                return None
+            
+            # Log stock movement
+            Product.log_stock_movement(product_id, quantity_change, movement_type, notes, session=session)
+            
+            return product['stock']
         
-        # Handle both 'stock' and 'quantity' field names for compatibility
-        current_stock = product.get('stock', product.get('quantity', 0))
-        new_quantity = current_stock + quantity_change
+        new_stock = run_in_transaction(apply)
+        if new_stock is not None:
+            notify_change("products")
+        return new_stock
+    
+    @staticmethod
+    def apply_stock_deltas(lines, movement_type, reference, session=None):
+        """
+        Apply stock changes for many products at once, all or nothing
         
-        if new_quantity < 0:
-            return False  # Cannot have negative stock
+        Inside a transaction all product updates go out in a single
+        bulk_write and a shortfall aborts everything. On standalone servers
+        products are updated one at a time and the lines already applied
+        are reverted before raising. Movement rows go out in a single
+        insert_many.
         
-        # Update both fields to ensure consistency
-        db.products.update_one(
-            {"_id": ObjectId(product_id)},
-            {
-                "$set": {
-                    "stock": new_quantity,
-                    "quantity": new_quantity,
-                    "updated_at": datetime.now()
-                }
-            }
-        )
+        Args:
+            lines: List of {product_id, quantity_change, unit_cost (optional)}
+            movement_type: Type of movement (sale, purchase, adjustment, etc.)
+            reference: Notes stored on every movement (e.g. "Sold via bill INV-...")
+            session: Optional session to join a caller's transaction
         
-        # Log stock movement
-        Product.log_stock_movement(product_id, quantity_change, movement_type, notes)
+        Returns:
+            Dict of product_id -> applied quantity change
         
-        return True
+        Raises:
+            InsufficientStockError: if any product is missing or would go negative
+        """
+        db = get_database()
+        
+        # Merge repeated lines for the same product
+        deltas = {}
+        costs = {}  # product_id -> [total cost, quantity] of lines that carry a unit cost
+        for line in lines:
+            product_id = str(line['product_id'])
+            deltas[product_id] = deltas.get(product_id, 0) + line['quantity_change']
+            if line.get('unit_cost') is not None:
+                costed = costs.setdefault(product_id, [0, 0])
+                costed[0] += line['quantity_change'] * line['unit_cost']
+                costed[1] += line['quantity_change']
+        deltas = {pid: change for pid, change in deltas.items() if change}
+        # Average over the costed lines only, so uncosted lines don't dilute it
+        unit_costs = {pid: total / quantity for pid, (total, quantity) in costs.items() if pid in deltas and quantity}
+        
+        if not deltas:
+            return {}
+        
+        def apply_standalone():
+            # One guarded update per product, so the applied ones are known exactly
+            applied = []
+            for pid, change in deltas.items():
+                result = db.products.update_one(Product._stock_guard(pid, change), Product._stock_pipeline(change))
+                if not result.matched_count:
+                    # No transaction to abort: undo the lines that went through
+                    # with the exact inverse change
+                    if applied:
+                        db.products.bulk_write([
+                            UpdateOne({"_id": ObjectId(done)}, Product._stock_pipeline(-deltas[done]))
+                            for done in applied
+                        ])
+                    raise InsufficientStockError([pid])
+                applied.append(pid)
+        
+        def apply(session):
+            if session is None:
+                apply_standalone()
+            else:
+                batch_id = ObjectId()
+                ops = [
+                    UpdateOne(
+                        Product._stock_guard(pid, change),
+                        Product._stock_pipeline(change, stock_batch_id=batch_id)
+                    )
+                    for pid, change in deltas.items()
+                ]
+                result = db.products.bulk_write(ops, ordered=False, session=session)
+                
+                if result.matched_count < len(ops):
+                    # Read inside the transaction, so the marker cannot have
+                    # been overwritten; the caller's transaction is aborted
+                    applied = {
+                        str(p['_id']) for p in db.products.find(
+                            {"_id": {"$in": [ObjectId(pid) for pid in deltas]}, "stock_batch_id": batch_id},
+                            {"_id": 1},
+                            session=session
+                        )
+                    }
+                    raise InsufficientStockError(sorted(set(deltas) - applied))
+            
+            db.stock_movements.insert_many(
+                [
+                    Product._movement_doc(pid, change, movement_type, reference, unit_costs.get(pid))
+                    for pid, change in deltas.items()
+                ],
+                session=session
+            )
+            return deltas
+        
+        applied = apply(session) if session is not None else run_in_transaction(apply)
+        notify_change("products")
+        return applied
     
     @staticmethod
     def delete_product(product_id):
         """Delete product"""
         db = get_database()
-        return db.products.delete_one({"_id": ObjectId(product_id)})
+        result = db.products.delete_one({"_id": ObjectId(product_id)})
+        ProductSearch.remove_product(product_id)
+        notify_change("products")
+        return result
     
     @staticmethod
-    def search_products(search_term):
-        """Search products by name, SKU, category, or description with multi-term support"""
+    def search_products(search_term, limit=50, category=None):
+        """
+        Search products by name, SKU, category, or description with multi-term support
+        
+        Ranked by the search service (weighted text index plus trigram
+        matching for prefixes and typos); best matches first.
+        
+        Args:
+            search_term: Free text; every term must match
+            limit: Maximum number of results (0 = no limit)
+            category: Only return products in this category
+        """
         db = get_database()
         
-        terms = search_term.split()
-        if not terms:
+        # The category is applied before the limit, so a category filter
+        # never hides matches that rank below other categories
+        ranked = ProductSearch.search(search_term, limit=0 if category else limit)
+        if not ranked:
             return []
-            
-        # Create a list of regex conditions for each term
-        # Each term must match at least one field (Name OR SKU OR Category OR Description)
-        and_conditions = []
-        for term in terms:
-            term_regex = {"$regex": term, "$options": "i"}
-            and_conditions.append({
-                "$or": [
-                    {"name": term_regex},
-                    {"sku": term_regex},
-                    {"category": term_regex},
-                    {"description": term_regex}
-                ]
-            })
-            
-        return list(db.products.find({"$and": and_conditions}))
+        
+        ids = [ObjectId(doc_id) for doc_id, _ in ranked]
+        query = {"_id": {"$in": ids}}
+        if category:
+            query["category"] = category
+        products = {str(p['_id']): p for p in db.products.find(query)}
+        if category and limit:
+            ranked = [r for r in ranked if r[0] in products][:limit]
+        return [products[doc_id] for doc_id, _ in ranked if doc_id in products]
     
     @staticmethod
+    @cached_query(ttl=30, topics=("products",))
     def get_low_stock_items():
-        """Get products with quantity below reorder level"""
+        """Get products at or below their reorder point (or reorder level)"""
+        db = get_database()
+        return list(db.products.find({"is_low_stock": True}))
+    
+    @staticmethod
+    def refresh_low_stock_flags():
+        """
+        Recompute the materialized is_low_stock flag for every product
+        Used to backfill existing data or repair drift from direct writes
+        
+        Returns:
+            Number of products whose flag changed
+        """
         db = get_database()
-        return list(db.products.find({
-            "$expr": {"$lte": ["$quantity", "$reorder_level"]}
-        }))
+        result = db.products.update_many({}, [LOW_STOCK_STAGE])
+        notify_change("products")
+        return result.modified_count
     
     @staticmethod
+    @cached_query(ttl=300, topics=("products",))
     def get_categories():
         """Get all unique categories"""
         db = get_database()
         return db.products.distinct("category")
     
     @staticmethod
+    @cached_query(ttl=60, topics=("products",))
     def get_products_by_category(category):
         """Get all products in a category"""
         db = get_database()
         return list(db.products.find({"category": category}))
     
     @staticmethod
-    def log_stock_movement(product_id, quantity_change, movement_type, notes):
-        """Log stock movement for tracking"""
-        db = get_database()
-        
-        movement_doc = {
+    def _movement_doc(product_id, quantity_change, movement_type, notes, unit_cost=None):
+        """Build a stock movement document (unit_cost is set on priced receipts)"""
+        movement = {
             "product_id": ObjectId(product_id),
             "quantity_change": quantity_change,
             "movement_type": movement_type,
             "notes": notes,
             "timestamp": datetime.now()
         }
+        if unit_cost is not None:
+            movement["unit_cost"] = float(unit_cost)
+        return movement
+    
+    @staticmethod
+    def log_stock_movement(product_id, quantity_change, movement_type, notes, session=None, unit_cost=None):
+        """Log stock movement for tracking"""
+        db = get_database()
+        
+        movement_doc = Product._movement_doc(product_id, quantity_change, movement_type, notes, unit_cost)
         
-        db.stock_movements.insert_one(movement_doc)
+        db.stock_movements.insert_one(movement_doc, session=session)
     
     @staticmethod
-    def get_stock_movements(product_id=None, limit=50):
-        """Get stock movement history"""
+    def get_stock_movements(product_id=None, limit=50, include_product=False, after=None):
+        """
+        Get stock movement history, newest first
+        
+        Args:
+            product_id: Optional product to filter by
+            limit: Maximum number of movements
+            include_product: Join product_name and product_sku in one $lookup
+            after: Cursor from get_stock_movements_page to continue from
+        """
         db = get_database()
         query = {"product_id": ObjectId(product_id)} if product_id else {}
-        return list(db.stock_movements.find(query).sort("timestamp", -1).limit(limit))
+        if after:
+            query = {"$and": [query, keyset_filter("timestamp", after)]} if query else keyset_filter("timestamp", after)
+        
+        if not include_product:
+            return list(db.stock_movements.find(query).sort(keyset_sort("timestamp")).limit(limit))
+        
+        pipeline = [
+            {"$match": query},
+            {"$sort": dict(keyset_sort("timestamp"))},
+            {"$limit": limit},
+            {"$lookup": {
+                "from": "products",
+                "localField": "product_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"_id": 0, "name": 1, "sku": 1}}],
+                "as": "product"
+            }},
+            {"$unwind": {"path": "$product", "preserveNullAndEmptyArrays": True}},
+            {"$set": {"product_name": "$product.name", "product_sku": "$product.sku"}},
+            {"$unset": "product"}
+        ]
+        return list(db.stock_movements.aggregate(pipeline))
+    
+    @staticmethod
+    def get_stock_movements_page(product_id=None, page_size=50, include_product=False, after=None):
+        """
+        Get one page of stock movement history
+        
+        Returns:
+            (movements, next_cursor) - next_cursor is None on the last page
+        """
+        movements = Product.get_stock_movements(product_id, page_size, include_product, after)
+        return movements, next_cursor(movements, "timestamp", page_size)
@@ -4,18 +4,29 @@ Purchase Order model for managing procurement
 """
 from datetime import datetime
 from bson import ObjectId
-from config.database import get_database
+from pymongo import ReturnDocument
+from config.database import get_database, run_in_transaction
+from models.counter import Counter
+from models.product import Product
+from utils.cache import notify_change
 
 class PurchaseOrder:
     """Purchase Order model"""
     
+    @staticmethod
+    def generate_po_number():
+        """Allocate the next PO number for today (PO-YYYYMMDD-0001)"""
+        return Counter.next_number("PO", "purchase_order")
+    
     @staticmethod
     def create_po(po_number, supplier_id, supplier_name, order_date, expected_delivery, 
                   items, status="Draft", notes="", shipping_address="", created_by=None):
         """
         Create a new purchase order
+        A PO number is allocated when po_number is blank
         """
         db = get_database()
+        po_number = po_number or PurchaseOrder.generate_po_number()
         
         # Calculate totals
         total_amount = sum(item['total'] for item in items)
@@ -37,6 +48,7 @@ class PurchaseOrder:
         }
         
         result = db.purchase_orders.insert_one(po_doc)
+        notify_change("purchase_orders")
         return str(result.inserted_id)
     
     @staticmethod
@@ -53,14 +65,76 @@ class PurchaseOrder:
     
     @staticmethod
     def update_status(po_id, status):
-        """Update PO status"""
+        """
+        Update PO status
+        The first move to Received stamps received_at (used for lead times)
+        """
+        db = get_database()
+        now = datetime.now()
+        update = {"$set": {"status": status, "updated_at": now}}
+        if status == "Received":
+            update["$min"] = {"received_at": now}
+        db.purchase_orders.update_one({"_id": ObjectId(po_id)}, update)
+        notify_change("purchase_orders")
+    
+    @staticmethod
+    def receive(po_id):
+        """
+        Mark a PO as Received and add its stock, exactly once
+        
+        The status change is claimed first with a conditional update, so
+        a double click or a second session cannot receive the PO twice.
+        Lines whose product no longer exists are skipped and reported.
+        
+        Returns:
+            Dict with received (lines applied) and missing (item names of
+            deleted products), or None if the PO was already received or
+            does not exist
+        """
         db = get_database()
-        db.purchase_orders.update_one(
-            {"_id": ObjectId(po_id)},
-            {
-                "$set": {
-                    "status": status,
-                    "updated_at": datetime.now()
-                }
+        
+        def apply(session):
+            now = datetime.now()
+            po = db.purchase_orders.find_one_and_update(
+                {"_id": ObjectId(po_id), "status": {"$ne": "Received"}},
+                {"$set": {"status": "Received", "updated_at": now}, "$min": {"received_at": now}},
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            if po is None:
+                return None
+            
+            linked = [item for item in po['items'] if ObjectId.is_valid(str(item.get('product_id')))]
+            existing = {
+                str(p['_id']) for p in db.products.find(
+                    {"_id": {"$in": [ObjectId(str(item['product_id'])) for item in linked]}},
+                    {"_id": 1},
+                    session=session
+                )
+            }
+            lines = [
+                {'product_id': item['product_id'], 'quantity_change': item['quantity'],
+                 'unit_cost': item.get('unit_price')}
+                for item in linked if str(item['product_id']) in existing
+            ]
+            
+            try:
+                Product.apply_stock_deltas(lines, "purchase", f"Received via PO {po['po_number']}", session=session)
+            except Exception:
+                if session is None:
+                    # No transaction to abort: release the claim
+                    restore = {"$set": {"status": po['status'], "updated_at": po.get('updated_at')}}
+                    if po.get('received_at') is None:
+                        restore["$unset"] = {"received_at": ""}
+                    db.purchase_orders.update_one({"_id": po['_id']}, restore)
+                raise
+            
+            return {
+                "received": len(lines),
+                "missing": [item.get('name', str(item.get('product_id')))
+                            for item in po['items'] if str(item.get('product_id')) not in existing]
             }
-        )
+        
+        result = run_in_transaction(apply)
+        notify_change("purchase_orders")
+        return result
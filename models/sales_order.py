@@ -5,16 +5,25 @@ Sales Order model for managing customer orders
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_database
+from models.counter import Counter
+from utils.cache import notify_change
 
 class SalesOrder:
     """Sales Order model"""
     
+    @staticmethod
+    def generate_order_number():
+        """Allocate the next sales order number for today (SO-YYYYMMDD-0001)"""
+        return Counter.next_number("SO", "sales_order")
+    
     @staticmethod
     def create_order(order_number, customer_name, order_date, delivery_date, items, notes="", created_by=None):
         """
         Create a new sales order
+        An order number is allocated when order_number is blank
         """
         db = get_database()
+        order_number = order_number or SalesOrder.generate_order_number()
         
         # Calculate totals
         total_amount = sum(item['total'] for item in items)
@@ -33,6 +42,7 @@ class SalesOrder:
         }
         
         result = db.sales_orders.insert_one(order_doc)
+        notify_change("sales_orders")
         return str(result.inserted_id)
     
     @staticmethod
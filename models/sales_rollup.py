@@ -0,0 +1,273 @@
+"""
+Sales rollup model - pre-aggregated daily sales
+One document per (date, product_id, category) with revenue, units and
+bill_count. Rows with product_id None hold the whole-day bill totals.
+The _id is derived from the key so upserts and $merge never collide.
+Bill lines carry the category they were sold under, so removing a bill
+hits the same rows even after the product changes category.
+"""
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from config.database import get_database
+
+
+class SalesRollup:
+    """Daily sales rollup maintained incrementally from bills"""
+
+    @staticmethod
+    def day_of(moment):
+        """Midnight of the day containing `moment`"""
+        return datetime.combine(moment.date(), datetime.min.time())
+
+    @staticmethod
+    def key(day, product_id, category):
+        """Deterministic _id for a rollup row"""
+        return f"{day.strftime('%Y-%m-%d')}|{product_id or ''}|{category or ''}"
+
+    @staticmethod
+    def _upsert(day, product_id, category, inc, name=None):
+        """Upsert adding `inc` to one rollup row"""
+        update = {
+            "$inc": inc,
+            "$setOnInsert": {"date": day, "product_id": product_id, "category": category}
+        }
+        if name is not None:
+            update["$set"] = {"name": name}
+        return UpdateOne({"_id": SalesRollup.key(day, product_id, category)}, update, upsert=True)
+
+    @staticmethod
+    def build_ops(bill, categories, sign=1):
+        """
+        Build rollup upserts for a bill
+
+        Args:
+            bill: Bill document
+            categories: Dict of product_id -> category, used for lines
+                        without a stored category (older bills)
+            sign: 1 to add the bill, -1 to remove it
+
+        Returns:
+            List of UpdateOne operations for sales_daily
+        """
+        day = SalesRollup.day_of(bill['created_at'])
+
+        lines = {}
+        for item in bill['items']:
+            product_id = str(item.get('product_id'))
+            category = item.get('category') or categories.get(product_id, "Uncategorized")
+            line = lines.setdefault((product_id, category), {"revenue": 0, "units": 0, "name": item.get('name')})
+            line['revenue'] += item.get('total', 0)
+            line['units'] += item.get('quantity', 0)
+
+        ops = [
+            SalesRollup._upsert(
+                day, product_id, category,
+                {"revenue": sign * line['revenue'], "units": sign * line['units'], "bill_count": sign},
+                name=line['name']
+            )
+            for (product_id, category), line in lines.items()
+        ]
+
+        # Whole-day totals (bill totals include tax and discount)
+        ops.append(SalesRollup._upsert(
+            day, None, None,
+            {
+                "revenue": sign * bill.get('total', 0),
+                "units": sign * sum(line['units'] for line in lines.values()),
+                "bill_count": sign
+            }
+        ))
+        return ops
+
+    @staticmethod
+    def get_categories(product_ids, session=None):
+        """Map product ids to their current category in one query"""
+        db = get_database()
+        ids = [ObjectId(pid) for pid in product_ids if ObjectId.is_valid(pid)]
+        return {
+            str(p['_id']): p.get('category', 'Uncategorized')
+            for p in db.products.find({"_id": {"$in": ids}}, {"category": 1}, session=session)
+        }
+
+    @staticmethod
+    def with_categories(items, session=None):
+        """Copy of bill items with each product's current category stored on the line"""
+        categories = SalesRollup.get_categories(
+            {str(item.get('product_id')) for item in items}, session=session
+        )
+        return [
+            {**item, "category": categories.get(str(item.get('product_id')), "Uncategorized")}
+            for item in items
+        ]
+
+    @staticmethod
+    def apply_bill(bill, sign=1, session=None):
+        """
+        Add (sign=1) or remove (sign=-1) a bill from the rollup
+        """
+        db = get_database()
+        product_ids = {str(item.get('product_id')) for item in bill['items'] if not item.get('category')}
+        categories = SalesRollup.get_categories(product_ids, session=session) if product_ids else {}
+
+        db.sales_daily.bulk_write(SalesRollup.build_ops(bill, categories, sign), ordered=False, session=session)
+
+        if sign < 0:
+            db.sales_daily.delete_many(
+                {"date": SalesRollup.day_of(bill['created_at']), "bill_count": {"$lte": 0}},
+                session=session
+            )
+
+    @staticmethod
+    def rebuild(include_today=False):
+        """
+        Regenerate the rollup from raw bills (server-side $merge)
+
+        Rows are replaced in place and rows no longer produced by the bills
+        are deleted afterwards, so readers never see an empty or
+        half-filled collection. Today's rows are left to the incremental
+        path by default: a checkout landing mid-rebuild could otherwise be
+        overwritten. Pass include_today=True only while billing is idle.
+
+        Returns:
+            Number of rollup documents written
+        """
+        db = get_database()
+        rebuild_id = ObjectId()
+        today = SalesRollup.day_of(datetime.now())
+        bills = {"$match": {} if include_today else {"created_at": {"$lt": today}}}
+
+        day = {"$dateTrunc": {"date": "$created_at", "unit": "day"}}
+        day_str = {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}
+        merge = {"$merge": {"into": "sales_daily", "whenMatched": "replace", "whenNotMatched": "insert"}}
+
+        # Per-product rows: the stored line category wins (current product
+        # category for older bills); group lines per bill first so
+        # bill_count counts bills
+        db.bills.aggregate([
+            bills,
+            {"$unwind": "$items"},
+            {"$lookup": {
+                "from": "products",
+                "let": {"pid": {"$convert": {"input": "$items.product_id", "to": "objectId", "onError": None, "onNull": None}}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$pid"]}}},
+                    {"$project": {"_id": 0, "category": 1}}
+                ],
+                "as": "product"
+            }},
+            {"$group": {
+                "_id": {
+                    "date": day,
+                    # Same placeholders as key()/build_ops so both paths hit one row
+                    "product_id": {"$ifNull": [{"$toString": "$items.product_id"}, "None"]},
+                    "category": {"$ifNull": ["$items.category", {"$first": "$product.category"}, "Uncategorized"]},
+                    "bill": "$_id"
+                },
+                "revenue": {"$sum": "$items.total"},
+                "units": {"$sum": "$items.quantity"},
+                "name": {"$last": "$items.name"}
+            }},
+            {"$group": {
+                "_id": {"date": "$_id.date", "product_id": "$_id.product_id", "category": "$_id.category"},
+                "revenue": {"$sum": "$revenue"},
+                "units": {"$sum": "$units"},
+                "bill_count": {"$sum": 1},
+                "name": {"$last": "$name"}
+            }},
+            {"$project": {
+                "_id": 0,
+                "date": "$_id.date",
+                "product_id": "$_id.product_id",
+                "category": "$_id.category",
+                "name": 1,
+                "revenue": 1,
+                "units": 1,
+                "bill_count": 1,
+                "rebuild_id": {"$literal": rebuild_id}
+            }},
+            {"$set": {"_id": {"$concat": [day_str, "|", "$product_id", "|", "$category"]}}},
+            merge
+        ])
+
+        # Whole-day totals
+        db.bills.aggregate([
+            bills,
+            {"$group": {
+                "_id": day,
+                "revenue": {"$sum": "$total"},
+                "units": {"$sum": {"$sum": "$items.quantity"}},
+                "bill_count": {"$sum": 1}
+            }},
+            {"$project": {
+                "_id": 0,
+                "date": "$_id",
+                "product_id": {"$literal": None},
+                "category": {"$literal": None},
+                "revenue": 1,
+                "units": 1,
+                "bill_count": 1,
+                "rebuild_id": {"$literal": rebuild_id}
+            }},
+            {"$set": {"_id": {"$concat": [day_str, "||"]}}},
+            merge
+        ])
+
+        # Drop rows the bills no longer produce (deleted bills, old keys)
+        stale = {"rebuild_id": {"$ne": rebuild_id}}
+        if not include_today:
+            stale["date"] = {"$lt": today}
+        db.sales_daily.delete_many(stale)
+
+        return db.sales_daily.count_documents({"rebuild_id": rebuild_id})
+
+    @staticmethod
+    def day_range(start_date, end_date):
+        """$match on whole days covering [start_date, end_date]"""
+        query = {}
+        if start_date:
+            query["$gte"] = SalesRollup.day_of(start_date)
+        if end_date:
+            query["$lte"] = SalesRollup.day_of(end_date)
+        return {"date": query} if query else {}
+
+    @staticmethod
+    def get_totals(start_date=None, end_date=None):
+        """
+        Revenue, units and bill count over whole days
+
+        Returns:
+            Dict with revenue, units, bill_count
+        """
+        db = get_database("analytics")
+        result = list(db.sales_daily.aggregate(SalesRollup.totals_pipeline(start_date, end_date)))
+        return SalesRollup.totals_result(result)
+    
+    @staticmethod
+    def totals_pipeline(start_date=None, end_date=None):
+        """Aggregation summing the whole-day rows over a date range"""
+        return [
+            {"$match": {"product_id": None, **SalesRollup.day_range(start_date, end_date)}},
+            {"$group": {
+                "_id": None,
+                "revenue": {"$sum": "$revenue"},
+                "units": {"$sum": "$units"},
+                "bill_count": {"$sum": "$bill_count"}
+            }}
+        ]
+    
+    @staticmethod
+    def totals_result(rows):
+        """Turn totals_pipeline output into a totals dict"""
+        if not rows:
+            return {"revenue": 0, "units": 0, "bill_count": 0}
+        totals = dict(rows[0])
+        totals.pop('_id')
+        return totals
+
+    @staticmethod
+    def get_daily(start_date, end_date):
+        """Whole-day totals, oldest first"""
+        db = get_database("analytics")
+        query = {"product_id": None, **SalesRollup.day_range(start_date, end_date)}
+        return list(db.sales_daily.find(query, {"_id": 0}).sort("date", 1))
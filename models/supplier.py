@@ -4,6 +4,7 @@ Supplier model for supplier management
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_database
+from utils.cache import cached_query, notify_change
 
 
 class Supplier:
@@ -39,9 +40,11 @@ class Supplier:
         }
         
         result = db.suppliers.insert_one(supplier_doc)
+        notify_change("suppliers")
         return str(result.inserted_id)
     
     @staticmethod
+    @cached_query(ttl=300, topics=("suppliers",))
     def get_all_suppliers():
         """Get all suppliers"""
         db = get_database()
@@ -58,16 +61,20 @@ class Supplier:
         """Update supplier information"""
         db = get_database()
         updates['updated_at'] = datetime.now()
-        return db.suppliers.update_one(
+        result = db.suppliers.update_one(
             {"_id": ObjectId(supplier_id)},
             {"$set": updates}
         )
+        notify_change("suppliers")
+        return result
     
     @staticmethod
     def delete_supplier(supplier_id):
         """Delete supplier"""
         db = get_database()
-        return db.suppliers.delete_one({"_id": ObjectId(supplier_id)})
+        result = db.suppliers.delete_one({"_id": ObjectId(supplier_id)})
+        notify_change("suppliers")
+        return result
     
     @staticmethod
     def search_suppliers(search_term):
@@ -6,12 +6,8 @@ import requests
 from dotenv import load_dotenv
 import google.generativeai as genai
 from models.product import Product
-from models.sales_order import SalesOrder
-from models.purchase_order import PurchaseOrder
-from models.supplier import Supplier
-from models.supplier import Supplier
-from models.invoice import Invoice
-from utils.analytics import get_sales_analytics_summary
+from services.context_builder import BusinessContextBuilder
+from services.compression_cache import CompressionCache
 import re
 
 load_dotenv()
@@ -20,6 +16,16 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 SCALEDOWN_API_KEY = os.getenv("SCALEDOWN_API_KEY")
 
+# Scaledown endpoint (override to point at a local stub server)
+SCALEDOWN_API_URL = os.getenv("SCALEDOWN_API_URL", "https://api.scaledown.ai/v1/compress")
+
+# Compression result cache
+compression_cache = CompressionCache(
+    cache_dir=os.getenv("SCALEDOWN_CACHE_DIR", os.path.join(".cache", "scaledown")),
+    max_memory_bytes=int(os.getenv("SCALEDOWN_CACHE_MEMORY_BYTES", 32 * 1024 * 1024)),
+    max_disk_bytes=int(os.getenv("SCALEDOWN_CACHE_DISK_BYTES", 256 * 1024 * 1024))
+)
+
 # Initialize Gemini
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
@@ -29,97 +35,39 @@ def get_full_business_context():
     """
     Fetch comprehensive business data for AI context
     Aggregates Inventory, Sales, Procurement, and Financials
+    Sections are cached and rebuilt concurrently by BusinessContextBuilder
     """
     try:
-        # Fetch Data
-        products = Product.get_all_products()
-        low_stock = Product.get_low_stock_items()
-        low_stock = Product.get_low_stock_items()
-        sales_orders = SalesOrder.get_all_orders(limit=100) # Fetch more for analytics
-        purchase_orders = PurchaseOrder.get_all_pos(limit=10)
-        purchase_orders = PurchaseOrder.get_all_pos(limit=10)
-        suppliers = Supplier.get_all_suppliers()
-        invoices = Invoice.get_all_invoices(limit=10)
-        
-        context = "=== 🏢 VAULTLY BUSINESS INTELLIGENCE CONTEXT ===\n\n"
-        
-        # 1. INVENTORY STATUS
-        context += f"--- 📦 INVENTORY SUMMARY ---\n"
-        context += f"Total SKU Count: {len(products)}\n"
-        context += f"Low Stock Alerts: {len(low_stock)} items\n"
-        if low_stock:
-            context += "⚠️ CRITICAL LOW STOCK:\n"
-            for item in low_stock:
-                name = item.get('name', 'Unknown')
-                qty = item.get('quantity', item.get('stock', 0))
-                unit = item.get('unit', 'units')
-                reorder = item.get('reorder_level', 0)
-                context += f"- {name} (Qty: {qty} {unit}, Reorder Lvl: {reorder})\n"
-        context += "\n"
-
-        # 2. PRODUCT CATALOG (Top 30 by default to save tokens)
-        context += f"--- 📋 PRODUCT CATALOG (Sample) ---\n"
-        for p in products[:30]:
-            pid = str(p.get('_id', 'N/A'))
-            name = p.get('name', 'Unknown')
-            sku = p.get('sku', 'N/A')
-            price = p.get('price', 0.0)
-            cost = p.get('cost', 0.0)
-            stock = p.get('quantity', p.get('stock', 0))
-            context += f"- ID: {pid} | {name} (SKU: {sku}, Price: ₹{price}, Cost: ₹{cost}, Stock: {stock})\n"
-        context += "\n"
-
-        # 3. SALES & ORDERS
-        context += f"--- 🛒 RECENT SALES ORDERS (Last 10) ---\n"
-        for so in sales_orders[:10]:
-            order_num = so.get('order_number', 'N/A')
-            cust_name = so.get('customer_name', 'Unknown')
-            total = so.get('total_amount', 0.0)
-            status = so.get('status', 'Unknown')
-            date = so.get('order_date')
-            date_str = date.strftime('%Y-%m-%d') if date else 'N/A'
-            context += f"- Order {order_num} | {cust_name} | ₹{total:,.2f} | Status: {status} | Date: {date_str}\n"
-            
-            # Add Line Items
-            items = so.get('items', [])
-            if items:
-                item_details = []
-                for item in items:
-                    i_name = item.get('name', 'Unknown')
-                    i_qty = item.get('quantity', 0)
-                    item_details.append(f"{i_name} (Qty: {i_qty})")
-                context += f"  Items: {', '.join(item_details)}\n"
-        context += "\n"
-
-        # ... (Rest of context generation remains same)
-
-        # 4. SALES ANALYTICS
-        analytics = get_sales_analytics_summary(sales_orders)
-        context += f"\n{analytics}\n"
-
-        return context
+        return BusinessContextBuilder.build()
     
     except Exception as e:
         return f"Error assembling business context: {e}"
 
 
-def compress_with_scaledown(text):
-    # ... (remains same)
+def compress_with_scaledown(text, compression_level="medium"):
+    """
+    Compress context with Scaledown
+    Results are cached by content hash, so an unchanged context skips
+    the network call entirely
+    """
     if not SCALEDOWN_API_KEY:
         return text, None
     
+    cached = compression_cache.get(text, compression_level)
+    if cached is not None:
+        return cached
+    
     try:
-        url = "https://api.scaledown.ai/v1/compress"
         headers = {
             "Authorization": f"Bearer {SCALEDOWN_API_KEY}",
             "Content-Type": "application/json"
         }
         data = {
             "text": text,
-            "compression_level": "medium"
+            "compression_level": compression_level
         }
         
-        response = requests.post(url, headers=headers, json=data, timeout=10)
+        response = requests.post(SCALEDOWN_API_URL, headers=headers, json=data, timeout=10)
         
         if response.status_code == 200:
             result = response.json()
@@ -129,6 +77,7 @@ def compress_with_scaledown(text):
                 'compressed_tokens': result.get('compressed_tokens', len(compressed_text.split())),
                 'compression_ratio': result.get('compression_ratio', 1.0)
             }
+            compression_cache.put(text, compression_level, compressed_text, stats)
             return compressed_text, stats
         else:
             return text, None
@@ -231,7 +180,7 @@ def chat_with_ai(user_message, chat_history=None, image_data=None):
             
             # Run search if it looks like a product query (simple heuristic)
             if len(search_term) > 2 and len(search_term) < 50:
-                 results = Product.search_products(search_term)
+                 results = Product.search_products(search_term, limit=10)
                  if results:
                     context += f"\n\n--- 🔍 SMART SEARCH RESULTS ('{search_term}') ---\n"
                     # Filter out products already in top 30 to avoid duplicates? 
@@ -285,7 +234,7 @@ def stream_ai_response(user_message, image_data=None):
             search_term = search_match.group(1).strip() if search_match else user_message
             
             if len(search_term) > 2 and len(search_term) < 50:
-                 results = Product.search_products(search_term)
+                 results = Product.search_products(search_term, limit=10)
                  if results:
                     context += f"\n\n--- 🔍 SMART SEARCH RESULTS ('{search_term}') ---\n"
                     for p in results[:10]:
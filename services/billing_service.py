@@ -0,0 +1,72 @@
+"""
+Billing Service - checkout as a single unit of work
+The bill, the stock deductions, the stock movements and the sales rollup
+are written in one transaction on replica sets. with_transaction retries
+the whole unit on transient errors (write conflicts, elections), so
+concurrent checkouts on the same products stay consistent.
+"""
+from config.database import get_database, run_in_transaction
+from models.bill import Bill
+from models.product import Product
+from models.sales_rollup import SalesRollup
+from utils.cache import notify_change
+
+
+class BillingService:
+    """Checkout workflow for the Bills view"""
+
+    @staticmethod
+    def checkout(cart, customer_name, customer_contact, tax_rate=0.18, discount=0, created_by=None):
+        """
+        Create a bill and deduct its stock, all or nothing
+
+        Args:
+            cart: List of items [{product_id, name, sku, quantity, price, total}]
+            customer_name: Customer name
+            customer_contact: Customer contact number
+            tax_rate: Tax rate as a fraction
+            discount: Discount amount
+            created_by: User ID who created the bill
+
+        Returns:
+            The inserted bill document
+
+        Raises:
+            InsufficientStockError: if any product lacks stock; nothing is written
+        """
+        db = get_database()
+
+        # Allocated outside the transaction so concurrent checkouts do not
+        # conflict on the counter document (a failed checkout leaves a gap)
+        bill_number = Bill.generate_bill_number()
+        lines = [
+            {"product_id": item['product_id'], "quantity_change": -item['quantity']}
+            for item in cart
+        ]
+
+        def apply(session):
+            bill_doc = Bill._bill_doc(
+                bill_number, customer_name, customer_contact,
+                SalesRollup.with_categories(cart, session=session), tax_rate, discount, created_by
+            )
+
+            # Stock first: without a transaction a shortfall is reverted
+            # before anything else has been written
+            Product.apply_stock_deltas(lines, "sale", f"Sold via bill {bill_number}", session=session)
+
+            try:
+                db.bills.insert_one(bill_doc, session=session)
+                SalesRollup.apply_bill(bill_doc, session=session)
+            except Exception:
+                if session is None:
+                    # No transaction to abort: put the stock back
+                    reverse = [{**line, "quantity_change": -line['quantity_change']} for line in lines]
+                    Product.apply_stock_deltas(reverse, "adjustment", f"Reverted failed bill {bill_number}")
+                    db.bills.delete_one({"bill_number": bill_number})
+                raise
+
+            return bill_doc
+
+        bill = run_in_transaction(apply)
+        notify_change("bills")
+        return bill
@@ -0,0 +1,154 @@
+"""
+Compression Cache for Scaledown results
+Two-level cache keyed by a hash of the text and compression level:
+an in-memory LRU and an on-disk store, both bounded by size in bytes.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class CompressionCache:
+    """LRU + on-disk cache of (compressed_text, stats) results"""
+
+    def __init__(self, cache_dir, max_memory_bytes=32 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (size, value)
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text, compression_level):
+        """Content hash of the text and compression level"""
+        digest = hashlib.sha256()
+        digest.update(compression_level.encode('utf-8'))
+        digest.update(b"\0")
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, text, compression_level):
+        """
+        Look up a cached result
+
+        Returns:
+            (compressed_text, stats) or None on a miss
+        """
+        key = self.make_key(text, compression_level)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+
+        try:
+            path = self._path(key)
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            os.utime(path)  # Refresh recency for disk eviction
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        value = (payload['compressed_text'], payload['stats'])
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, text, compression_level, compressed_text, stats):
+        """Store a result in memory and on disk"""
+        key = self.make_key(text, compression_level)
+        value = (compressed_text, stats)
+
+        with self._lock:
+            self._remember(key, value)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            data = json.dumps({"compressed_text": compressed_text, "stats": stats}).encode('utf-8')
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += len(data)
+            self._evict_disk()
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write compression cache: {e}")
+
+    def _remember(self, key, value):
+        """Insert into the memory LRU (caller holds the lock)"""
+        size = len(value[0].encode('utf-8'))
+        if size > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= old[0]
+        self._memory[key] = (size, value)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (old_size, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= old_size
+
+    def _evict_disk(self):
+        """Delete least recently used files until the store fits"""
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.max_disk_bytes:
+                return
+
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            self._disk_bytes = total
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith('.json'):
+                        os.remove(entry.path)
+            self._disk_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes
+        }
@@ -0,0 +1,148 @@
+"""
+Business Context Builder for the AI assistant
+Builds the context in independent sections whose queries run
+concurrently. Each section is cached with a short TTL and dropped as
+soon as a write touches one of the collections it depends on, so only
+changed sections are rebuilt on the next chat message.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from models.product import Product
+from models.sales_order import SalesOrder
+from utils.analytics import get_sales_analytics_summary
+from utils.cache import TTLCache, subscribe
+
+# Seconds a section may be served from cache without any write
+CONTEXT_TTL = 60
+
+HEADER = "=== 🏢 VAULTLY BUSINESS INTELLIGENCE CONTEXT ===\n\n"
+
+
+def _inventory_section():
+    """Inventory status with low stock alerts"""
+    total_products = Product.count_products()
+    low_stock = Product.get_low_stock_items()
+    
+    context = f"--- 📦 INVENTORY SUMMARY ---\n"
+    context += f"Total SKU Count: {total_products}\n"
+    context += f"Low Stock Alerts: {len(low_stock)} items\n"
+    if low_stock:
+        context += "⚠️ CRITICAL LOW STOCK:\n"
+        for item in low_stock:
+            name = item.get('name', 'Unknown')
+            qty = item.get('quantity', item.get('stock', 0))
+            unit = item.get('unit', 'units')
+            reorder = item.get('reorder_point', item.get('reorder_level', 0))
+            context += f"- {name} (Qty: {qty} {unit}, Reorder Lvl: {reorder})\n"
+    context += "\n"
+    return context
+
+
+def _catalog_section():
+    """Product catalog (Top 30 to save tokens)"""
+    context = f"--- 📋 PRODUCT CATALOG (Sample) ---\n"
+    products, _ = Product.list_products(fields=["name", "sku", "price", "cost", "stock"], limit=30)
+    for p in products:
+        pid = str(p.get('_id', 'N/A'))
+        name = p.get('name', 'Unknown')
+        sku = p.get('sku', 'N/A')
+        price = p.get('price', 0.0)
+        cost = p.get('cost', 0.0)
+        stock = p.get('quantity', p.get('stock', 0))
+        context += f"- ID: {pid} | {name} (SKU: {sku}, Price: ₹{price}, Cost: ₹{cost}, Stock: {stock})\n"
+    context += "\n"
+    return context
+
+
+def _sales_section():
+    """Recent sales orders and sales analytics"""
+    sales_orders = SalesOrder.get_all_orders(limit=100)  # Fetch more for analytics
+    
+    context = f"--- 🛒 RECENT SALES ORDERS (Last 10) ---\n"
+    for so in sales_orders[:10]:
+        order_num = so.get('order_number', 'N/A')
+        cust_name = so.get('customer_name', 'Unknown')
+        total = so.get('total_amount', 0.0)
+        status = so.get('status', 'Unknown')
+        date = so.get('order_date')
+        date_str = date.strftime('%Y-%m-%d') if date else 'N/A'
+        context += f"- Order {order_num} | {cust_name} | ₹{total:,.2f} | Status: {status} | Date: {date_str}\n"
+        
+        # Add Line Items
+        items = so.get('items', [])
+        if items:
+            item_details = []
+            for item in items:
+                i_name = item.get('name', 'Unknown')
+                i_qty = item.get('quantity', 0)
+                item_details.append(f"{i_name} (Qty: {i_qty})")
+            context += f"  Items: {', '.join(item_details)}\n"
+    context += "\n"
+    
+    analytics = get_sales_analytics_summary(sales_orders)
+    context += f"\n{analytics}\n"
+    return context
+
+
+class BusinessContextBuilder:
+    """Assembles the AI business context from cached sections"""
+    
+    # name -> (builder, topics whose writes invalidate it), in output order
+    SECTIONS = {
+        "inventory": (_inventory_section, ("products", "bills")),
+        "catalog": (_catalog_section, ("products", "bills")),
+        "sales": (_sales_section, ("sales_orders",)),
+    }
+    
+    _cache = TTLCache(CONTEXT_TTL, name="business_context")
+    _executor = ThreadPoolExecutor(max_workers=len(SECTIONS), thread_name_prefix="context")
+    # Bumped on every invalidation; a section built across a write is not stored
+    _generations = {name: 0 for name in SECTIONS}
+    
+    @staticmethod
+    def _invalidate_for(topic):
+        """Drop every section that depends on `topic`"""
+        for name, (_, topics) in BusinessContextBuilder.SECTIONS.items():
+            if topic in topics:
+                BusinessContextBuilder._generations[name] += 1
+                BusinessContextBuilder._cache.invalidate(name)
+    
+    @staticmethod
+    def build():
+        """
+        Build the full business context string
+        Stale sections are rebuilt concurrently; fresh ones come from cache
+        """
+        cache = BusinessContextBuilder._cache
+        generations = BusinessContextBuilder._generations
+        parts = {}
+        pending = {}
+        
+        for name, (builder, _) in BusinessContextBuilder.SECTIONS.items():
+            found, text = cache.get(name)
+            if found:
+                parts[name] = text
+            else:
+                pending[name] = (generations[name], BusinessContextBuilder._executor.submit(builder))
+        
+        for name, (started, future) in pending.items():
+            parts[name] = future.result()
+            if generations[name] == started:
+                cache.set(name, parts[name])
+        
+        return HEADER + "".join(parts[name] for name in BusinessContextBuilder.SECTIONS)
+    
+    @staticmethod
+    def invalidate():
+        """Drop all cached sections"""
+        for name in BusinessContextBuilder._generations:
+            BusinessContextBuilder._generations[name] += 1
+        BusinessContextBuilder._cache.invalidate()
+    
+    @staticmethod
+    def stats():
+        """Cache hit/miss counters"""
+        return BusinessContextBuilder._cache.stats()
+
+
+for _topic in {t for _, topics in BusinessContextBuilder.SECTIONS.values() for t in topics}:
+    subscribe(_topic, BusinessContextBuilder._invalidate_for)
@@ -0,0 +1,63 @@
+"""
+Dashboard Service - headline metrics for the Dashboard view
+Product metrics come from one $facet pass over products, sales from the
+sales_daily rollup, and the bill count from collection metadata.
+"""
+from config.database import get_database
+from models.product import CURRENT_STOCK
+from utils.cache import cached_query
+
+
+class DashboardService:
+    """Aggregations backing the dashboard overview"""
+
+    @staticmethod
+    @cached_query(ttl=30, topics=("products", "bills"))
+    def get_overview():
+        """
+        Headline inventory and sales metrics
+
+        Returns:
+            Dict with total_products, low_stock_count, inventory_value,
+            inventory_cost, bill_count and total_revenue
+        """
+        db = get_database("analytics")
+        pipeline = [
+            {"$facet": {
+                "totals": [
+                    {"$group": {
+                        "_id": None,
+                        "count": {"$sum": 1},
+                        "value": {"$sum": {"$multiply": [CURRENT_STOCK, {"$ifNull": ["$price", 0]}]}},
+                        "cost": {"$sum": {"$multiply": [CURRENT_STOCK, {"$ifNull": ["$cost", 0]}]}}
+                    }}
+                ],
+                "low_stock": [
+                    {"$match": {"is_low_stock": True}},
+                    {"$count": "count"}
+                ]
+            }},
+            # Uncorrelated lookup: all-time revenue from the day-total rollup rows
+            {"$lookup": {
+                "from": "sales_daily",
+                "pipeline": [
+                    {"$match": {"product_id": None}},
+                    {"$group": {"_id": None, "revenue": {"$sum": "$revenue"}}}
+                ],
+                "as": "sales"
+            }}
+        ]
+        result = next(db.products.aggregate(pipeline), {})
+
+        totals = (result.get('totals') or [{}])[0]
+        low_stock = (result.get('low_stock') or [{}])[0]
+        sales = (result.get('sales') or [{}])[0]
+        return {
+            "total_products": totals.get('count', 0),
+            "low_stock_count": low_stock.get('count', 0),
+            "inventory_value": totals.get('value', 0),
+            "inventory_cost": totals.get('cost', 0),
+            # Exact counts are not needed for a headline number
+            "bill_count": db.bills.estimated_document_count(),
+            "total_revenue": sales.get('revenue', 0)
+        }
@@ -0,0 +1,178 @@
+"""
+Inventory Valuation - point-in-time inventory value from the stock ledger
+Movements are replayed in time order through per-product cost layers
+(FIFO) or running averages (weighted average). Receipts are costed from
+the unit_cost stored on the movement (PO receipts, initial stock) and
+fall back to the product's current cost.
+
+Ledger replay state is kept as in-process checkpoints: a query for time
+T resumes from the latest checkpoint at or before T and only replays the
+movements after it, so repeated and month-by-month queries are cheap.
+"""
+import bisect
+import copy
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from config.database import get_database
+
+METHODS = ("FIFO", "weighted_avg")
+
+# Checkpoints kept per method (oldest dropped first)
+MAX_CHECKPOINTS = 24
+
+# Movements may still be written with timestamps this close to now, so
+# checkpoints are only stored for older moments
+CHECKPOINT_MARGIN = timedelta(minutes=5)
+
+
+class _ReplayState:
+    """Per-product cost layers after replaying movements up to `as_of`"""
+
+    def __init__(self, method):
+        self.method = method
+        self.as_of = None
+        # FIFO: product_id -> deque of [quantity, unit_cost]
+        # weighted_avg: product_id -> [quantity, average_cost]
+        self.layers = {}
+
+    def receive(self, product_id, quantity, unit_cost):
+        if self.method == "FIFO":
+            self.layers.setdefault(product_id, deque()).append([quantity, unit_cost])
+            return
+        held = self.layers.setdefault(product_id, [0, 0.0])
+        total = held[0] + quantity
+        held[1] = (held[0] * held[1] + quantity * unit_cost) / total if total > 0 else unit_cost
+        held[0] = total
+
+    def issue(self, product_id, quantity):
+        if self.method == "FIFO":
+            layers = self.layers.get(product_id)
+            while quantity > 0 and layers:
+                if layers[0][0] > quantity:
+                    layers[0][0] -= quantity
+                    break
+                quantity -= layers.popleft()[0]
+            return
+        held = self.layers.get(product_id)
+        if held:
+            held[0] = max(0, held[0] - quantity)
+
+    def holdings(self):
+        """Yield (product_id, quantity, value) for every product in stock"""
+        for product_id, layers in self.layers.items():
+            if self.method == "FIFO":
+                quantity = sum(q for q, _ in layers)
+                value = sum(q * c for q, c in layers)
+            else:
+                quantity, value = layers[0], layers[0] * layers[1]
+            if quantity > 0:
+                yield product_id, quantity, value
+
+
+class InventoryValuation:
+    """Point-in-time inventory valuation"""
+
+    _checkpoints = {method: [] for method in METHODS}  # method -> [(as_of, state)] sorted
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _replay(state, until, fallback_costs):
+        """Advance a replay state through movements in (state.as_of, until]"""
+        db = get_database("analytics")
+        window = {"$lte": until}
+        if state.as_of is not None:
+            window["$gt"] = state.as_of
+
+        cursor = db.stock_movements.find(
+            {"timestamp": window},
+            {"_id": 0, "product_id": 1, "quantity_change": 1, "unit_cost": 1}
+        ).sort([("timestamp", 1), ("_id", 1)]).batch_size(10000)
+
+        for movement in cursor:
+            product_id = movement['product_id']
+            change = movement['quantity_change']
+            if change > 0:
+                unit_cost = movement.get('unit_cost')
+                if unit_cost is None:
+                    unit_cost = fallback_costs.get(product_id, 0.0)
+                state.receive(product_id, change, unit_cost)
+            elif change < 0:
+                state.issue(product_id, -change)
+
+        state.as_of = until
+        return state
+
+    @staticmethod
+    def _start_state(method, at):
+        """Copy of the latest checkpoint at or before `at`, or a fresh state"""
+        with InventoryValuation._lock:
+            checkpoints = InventoryValuation._checkpoints[method]
+            index = bisect.bisect_right([as_of for as_of, _ in checkpoints], at)
+            if index:
+                return copy.deepcopy(checkpoints[index - 1][1])
+        return _ReplayState(method)
+
+    @staticmethod
+    def _store_checkpoint(state):
+        if state.as_of > datetime.now() - CHECKPOINT_MARGIN:
+            return
+        with InventoryValuation._lock:
+            checkpoints = InventoryValuation._checkpoints[state.method]
+            times = [as_of for as_of, _ in checkpoints]
+            index = bisect.bisect_left(times, state.as_of)
+            if index < len(times) and times[index] == state.as_of:
+                return
+            checkpoints.insert(index, (state.as_of, copy.deepcopy(state)))
+            if len(checkpoints) > MAX_CHECKPOINTS:
+                checkpoints.pop(0)
+
+    @staticmethod
+    def clear_checkpoints():
+        """Drop all checkpoints (after editing or deleting past movements)"""
+        with InventoryValuation._lock:
+            for checkpoints in InventoryValuation._checkpoints.values():
+                checkpoints.clear()
+
+    @staticmethod
+    def as_of(at, method="FIFO"):
+        """
+        Value inventory at a past moment
+
+        Args:
+            at: datetime (or date, meaning end of that day)
+            method: "FIFO" or "weighted_avg"
+
+        Returns:
+            Dict with as_of, method, total_quantity, total_value and
+            by_category [{category, quantity, value}]
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown valuation method: {method}")
+        if not isinstance(at, datetime):
+            at = datetime.combine(at, datetime.max.time())
+
+        db = get_database("analytics")
+        products = {
+            p['_id']: p for p in db.products.find({}, {"category": 1, "cost": 1})
+        }
+        fallback_costs = {pid: float(p.get('cost') or 0.0) for pid, p in products.items()}
+
+        state = InventoryValuation._replay(InventoryValuation._start_state(method, at), at, fallback_costs)
+        InventoryValuation._store_checkpoint(state)
+
+        by_category = {}
+        for product_id, quantity, value in state.holdings():
+            category = products.get(product_id, {}).get('category') or "Uncategorized"
+            row = by_category.setdefault(category, {"category": category, "quantity": 0, "value": 0.0})
+            row['quantity'] += quantity
+            row['value'] += value
+
+        rows = sorted(by_category.values(), key=lambda r: r['category'])
+        return {
+            "as_of": at,
+            "method": method,
+            "total_quantity": sum(r['quantity'] for r in rows),
+            "total_value": sum(r['value'] for r in rows),
+            "by_category": rows
+        }
@@ -0,0 +1,165 @@
+"""
+Reorder Planner - dynamic reorder points and order quantities
+Daily demand per SKU comes from the sales rollup and lead times from
+received purchase orders (order_date to received_at). For every SKU at
+once:
+
+    reorder_point     = mean_demand * lead_time + safety_stock
+    safety_stock      = z * sqrt(lead_time * var_demand + mean_demand^2 * var_lead_time)
+    reorder_quantity  = sqrt(2 * annual_demand * order_cost / (holding_rate * unit_cost))
+
+A stored reorder_point takes precedence over the manual reorder_level
+in the low-stock flag (see LOW_STOCK_STAGE).
+"""
+import os
+from datetime import datetime, timedelta
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+from pymongo import UpdateMany, UpdateOne
+from config.database import get_database
+from models.product import LOW_STOCK_STAGE
+from utils.analytics import build_demand_matrix, load_sales_history
+from utils.cache import notify_change
+
+# Planning parameters (overridable from the environment)
+HISTORY_DAYS = int(os.getenv("REORDER_HISTORY_DAYS", 180))
+SERVICE_LEVEL = float(os.getenv("REORDER_SERVICE_LEVEL", 0.95))
+DEFAULT_LEAD_TIME_DAYS = float(os.getenv("REORDER_DEFAULT_LEAD_TIME_DAYS", 7))
+ORDER_COST = float(os.getenv("REORDER_ORDER_COST", 500))
+HOLDING_RATE = float(os.getenv("REORDER_HOLDING_RATE", 0.25))
+
+PLAN_FIELDS = ("reorder_point", "reorder_quantity", "safety_stock", "lead_time_days", "reorder_computed_at")
+
+
+class ReorderPlanner:
+    """Batch computation of reorder points from sales and PO history"""
+
+    @staticmethod
+    def get_lead_times():
+        """
+        Lead time statistics per product from received purchase orders
+
+        Returns:
+            DataFrame indexed by product_id (str) with lead_mean and lead_std
+            in days
+        """
+        db = get_database("analytics")
+        rows = list(db.purchase_orders.aggregate([
+            {"$match": {"status": "Received", "received_at": {"$ne": None}, "order_date": {"$ne": None}}},
+            {"$project": {
+                "items.product_id": 1,
+                "lead_days": {"$divide": [{"$subtract": ["$received_at", "$order_date"]}, 86400000]}
+            }},
+            {"$unwind": "$items"},
+            {"$match": {"items.product_id": {"$ne": None}}},
+            {"$group": {
+                "_id": {"$toString": "$items.product_id"},
+                "lead_mean": {"$avg": "$lead_days"},
+                "lead_std": {"$stdDevPop": "$lead_days"}
+            }}
+        ]))
+        if not rows:
+            return pd.DataFrame(columns=["lead_mean", "lead_std"], index=pd.Index([], name="product_id"))
+        return pd.DataFrame(rows).rename(columns={"_id": "product_id"}).set_index("product_id")
+
+    @staticmethod
+    def compute_plan(history_days=HISTORY_DAYS, service_level=SERVICE_LEVEL):
+        """
+        Reorder point and order quantity for every SKU with sales history
+
+        Returns:
+            DataFrame indexed by product_id (str) with demand_mean,
+            demand_std, lead_time_days, safety_stock, reorder_point and
+            reorder_quantity
+        """
+        end = datetime.now()
+        start = end - timedelta(days=history_days)
+        matrix, product_ids, days = build_demand_matrix(load_sales_history(start, end), start, end)
+        if len(product_ids) == 0:
+            return pd.DataFrame(columns=["demand_mean", "demand_std", "lead_time_days",
+                                         "safety_stock", "reorder_point", "reorder_quantity"])
+
+        plan = pd.DataFrame({
+            "demand_mean": matrix.mean(axis=1, dtype=np.float64),
+            "demand_std": matrix.std(axis=1, dtype=np.float64)
+        }, index=pd.Index(product_ids, name="product_id"))
+
+        # Products never received through a PO use the average across all
+        # products, or the configured default when there is no PO history
+        lead = ReorderPlanner.get_lead_times().reindex(plan.index)
+        fallback = lead['lead_mean'].mean() if lead['lead_mean'].notna().any() else DEFAULT_LEAD_TIME_DAYS
+        lead_mean = lead['lead_mean'].fillna(fallback).to_numpy(dtype=np.float64)
+        lead_std = lead['lead_std'].fillna(0).to_numpy(dtype=np.float64)
+
+        db = get_database("analytics")
+        costs = {
+            str(p['_id']): float(p.get('cost') or 0)
+            for p in db.products.find({}, {"cost": 1})
+        }
+        unit_cost = plan.index.map(lambda pid: costs.get(pid, 0.0)).to_numpy(dtype=np.float64)
+
+        mean, std = plan['demand_mean'].to_numpy(), plan['demand_std'].to_numpy()
+        z = NormalDist().inv_cdf(service_level)
+        safety = z * np.sqrt(lead_mean * std ** 2 + mean ** 2 * lead_std ** 2)
+
+        holding = HOLDING_RATE * unit_cost
+        eoq = np.sqrt(np.divide(2 * mean * 365 * ORDER_COST, holding, out=np.zeros_like(holding), where=holding > 0))
+
+        plan['lead_time_days'] = np.round(lead_mean, 1)
+        plan['safety_stock'] = np.ceil(safety).astype(int)
+        plan['reorder_point'] = np.ceil(mean * lead_mean + safety).astype(int)
+        # Without a cost there is no EOQ; fall back to one lead time of demand
+        plan['reorder_quantity'] = np.maximum(np.ceil(np.where(eoq > 0, eoq, mean * lead_mean)), 1).astype(int)
+
+        # Rows for deleted products are dropped here
+        return plan[plan.index.isin(list(costs))]
+
+    @staticmethod
+    def apply_plan(plan):
+        """
+        Write a computed plan to products in one bulk_write
+
+        Products left out of the plan (no recent sales) lose any stored
+        reorder point and fall back to their manual reorder_level.
+
+        Returns:
+            Dict with planned (products in the plan) and modified
+            (documents changed by the write) counts
+        """
+        db = get_database()
+        # Millisecond precision, as stored, so the stale filter below matches
+        now = datetime.now()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+        ops = [
+            UpdateOne(
+                {"_id": ObjectId(pid)},
+                [
+                    {"$set": {
+                        "reorder_point": int(row.reorder_point),
+                        "reorder_quantity": int(row.reorder_quantity),
+                        "safety_stock": int(row.safety_stock),
+                        "lead_time_days": float(row.lead_time_days),
+                        "reorder_computed_at": now
+                    }},
+                    LOW_STOCK_STAGE
+                ]
+            )
+            for pid, row in zip(plan.index, plan.itertuples(index=False))
+        ]
+        # Runs last (ordered): anything not stamped in this round is stale
+        ops.append(UpdateMany(
+            {"reorder_point": {"$exists": True}, "reorder_computed_at": {"$ne": now}},
+            [{"$unset": list(PLAN_FIELDS)}, LOW_STOCK_STAGE]
+        ))
+
+        result = db.products.bulk_write(ops, ordered=True)
+        notify_change("products")
+        return {"planned": len(plan), "modified": result.modified_count}
+
+    @staticmethod
+    def run(history_days=HISTORY_DAYS, service_level=SERVICE_LEVEL):
+        """Compute and store reorder points for all products"""
+        return ReorderPlanner.apply_plan(ReorderPlanner.compute_plan(history_days, service_level))
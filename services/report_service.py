@@ -0,0 +1,124 @@
+"""
+Report Service - server-side aggregations for the Reports view
+Only small, already-grouped result sets come back to Python
+Sales figures are read from the sales_daily rollup, so date ranges are
+resolved to whole days.
+"""
+from config.database import get_database
+from models.product import CURRENT_STOCK
+from models.sales_rollup import SalesRollup
+
+
+class ReportService:
+    """Aggregation pipelines backing analytics and reports"""
+
+    @staticmethod
+    def _product_rows(start_date, end_date):
+        """$match stage for per-product rollup rows within a date range"""
+        return {"$match": {"product_id": {"$ne": None}, **SalesRollup.day_range(start_date, end_date)}}
+
+    @staticmethod
+    def get_sales_summary(start_date, end_date):
+        """
+        Total sales, bill count and items sold in a date range
+
+        Returns:
+            Dict with total_sales, bill_count, items_sold
+        """
+        totals = SalesRollup.get_totals(start_date, end_date)
+        return {
+            "total_sales": totals['revenue'],
+            "bill_count": totals['bill_count'],
+            "items_sold": totals['units']
+        }
+
+    @staticmethod
+    def get_daily_sales(start_date, end_date):
+        """
+        Sales totals per day
+
+        Returns:
+            List of {date: 'YYYY-MM-DD', sales}, oldest first
+        """
+        return [
+            {"date": row['date'].strftime('%Y-%m-%d'), "sales": row['revenue']}
+            for row in SalesRollup.get_daily(start_date, end_date)
+        ]
+
+    @staticmethod
+    def get_top_products(start_date, end_date, limit=10):
+        """
+        Best selling products by quantity
+
+        Returns:
+            List of {name, quantity}, best first
+        """
+        db = get_database("analytics")
+        pipeline = [
+            ReportService._product_rows(start_date, end_date),
+            {"$group": {"_id": "$product_id", "name": {"$last": "$name"}, "quantity": {"$sum": "$units"}}},
+            {"$sort": {"quantity": -1}},
+            {"$limit": limit},
+            {"$project": {"_id": 0, "name": 1, "quantity": 1}}
+        ]
+        return list(db.sales_daily.aggregate(pipeline))
+
+    @staticmethod
+    def get_category_revenue(start_date, end_date):
+        """
+        Revenue per product category (category at time of sale)
+
+        Returns:
+            List of {category, revenue}, largest first
+        """
+        db = get_database("analytics")
+        pipeline = [
+            ReportService._product_rows(start_date, end_date),
+            {"$group": {"_id": "$category", "revenue": {"$sum": "$revenue"}}},
+            {"$sort": {"revenue": -1}},
+            {"$project": {"_id": 0, "category": "$_id", "revenue": 1}}
+        ]
+        return list(db.sales_daily.aggregate(pipeline))
+
+    @staticmethod
+    def get_inventory_valuation():
+        """
+        Current inventory value at selling price and at cost
+
+        Returns:
+            Dict with total_value, total_cost and by_category
+            [{category, value, cost}]
+        """
+        db = get_database("analytics")
+        pipeline = [
+            {"$group": {
+                "_id": {"$ifNull": ["$category", "Uncategorized"]},
+                "value": {"$sum": {"$multiply": [CURRENT_STOCK, {"$ifNull": ["$price", 0]}]}},
+                "cost": {"$sum": {"$multiply": [CURRENT_STOCK, {"$ifNull": ["$cost", 0]}]}}
+            }},
+            {"$sort": {"_id": 1}},
+            {"$project": {"_id": 0, "category": "$_id", "value": 1, "cost": 1}}
+        ]
+        by_category = list(db.products.aggregate(pipeline))
+        return {
+            "total_value": sum(c['value'] for c in by_category),
+            "total_cost": sum(c['cost'] for c in by_category),
+            "by_category": by_category
+        }
+
+    @staticmethod
+    def get_bills_export(start_date, end_date):
+        """Bills in a date range with only the exported columns"""
+        db = get_database("analytics")
+        projection = {"bill_number": 1, "customer_name": 1, "customer_contact": 1, "total": 1, "created_at": 1}
+        return list(db.bills.find(
+            {"created_at": {"$gte": start_date, "$lte": end_date}},
+            projection
+        ).sort("created_at", -1))
+
+    @staticmethod
+    def get_inventory_export():
+        """Products with only the exported columns"""
+        db = get_database("analytics")
+        projection = {"sku": 1, "name": 1, "category": 1, "stock": 1, "quantity": 1, "price": 1}
+        return list(db.products.find({}, projection))
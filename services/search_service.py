@@ -0,0 +1,259 @@
+"""
+Product Search Service
+Combines a weighted MongoDB text index (whole words, stemming) with an
+in-process trigram index (prefix and typo tolerant matching)
+"""
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from bson import ObjectId
+from config.database import get_database
+
+# Relative importance of each field when ranking
+FIELD_WEIGHTS = {
+    "name": 10,
+    "sku": 8,
+    "category": 4,
+    "description": 1
+}
+
+# Fields held in the trigram index; description is served by the text index
+TRIGRAM_FIELDS = ("name", "sku", "category")
+
+# Share of a term's trigrams a field must contain to count as a match
+MIN_SIMILARITY = 0.4
+
+# Rebuild the in-process index after this many seconds so writes made by
+# other processes are eventually picked up
+INDEX_MAX_AGE = 300
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens of a string"""
+    return _TOKEN_RE.findall(str(text or "").lower())
+
+
+def trigrams(token):
+    """Trigrams of a token, padded so prefixes score higher"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """In-memory trigram index over product documents"""
+
+    def __init__(self):
+        self._postings = defaultdict(dict)  # trigram -> {doc_id: field weight}
+        self._doc_grams = {}                # doc_id -> set of trigrams
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_grams)
+
+    def add(self, doc):
+        """Index (or re-index) a product document"""
+        doc_id = str(doc['_id'])
+        grams = {}
+        for field in TRIGRAM_FIELDS:
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(doc.get(field)):
+                for gram in trigrams(token):
+                    if grams.get(gram, 0) < weight:
+                        grams[gram] = weight
+
+        with self._lock:
+            self.remove(doc_id)
+            for gram, weight in grams.items():
+                self._postings[gram][doc_id] = weight
+            self._doc_grams[doc_id] = set(grams)
+
+    def remove(self, doc_id):
+        """Drop a document from the index"""
+        doc_id = str(doc_id)
+        with self._lock:
+            for gram in self._doc_grams.pop(doc_id, ()):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.pop(doc_id, None)
+                    if not posting:
+                        del self._postings[gram]
+
+    def _plan_term(self, term):
+        """Posting lists for a term, rarest first, and the match threshold"""
+        grams = trigrams(term)
+        needed = math.ceil(len(grams) * MIN_SIMILARITY)
+        lists = sorted((self._postings.get(g, {}) for g in grams), key=len)
+        # Any document sharing `needed` trigrams must appear in at least one
+        # of the (len - needed + 1) rarest posting lists
+        cost = sum(len(posting) for posting in lists[:len(lists) - needed + 1])
+        return lists, needed, cost
+
+    def _match_term(self, lists, needed, restrict=None):
+        """Score every document matching a single planned query term"""
+        if restrict is not None:
+            candidates = restrict
+        else:
+            candidates = set()
+            for posting in lists[:len(lists) - needed + 1]:
+                candidates.update(posting)
+
+        scores = {}
+        for doc_id in candidates:
+            matched = 0
+            weight = 0
+            for posting in lists:
+                w = posting.get(doc_id)
+                if w:
+                    matched += 1
+                    weight += w
+            if matched >= needed:
+                scores[doc_id] = weight / len(lists)
+        return scores
+
+    def search(self, query, limit=50):
+        """
+        Rank documents matching every query term
+
+        Returns:
+            List of (doc_id, score), best first (limit 0 = all)
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            # Most selective terms first; later terms only probe survivors
+            plans = sorted((self._plan_term(term) for term in terms), key=lambda p: p[2])
+            totals = None
+            for lists, needed, cost in plans:
+                restrict = totals.keys() if totals is not None and len(totals) < cost else None
+                scores = self._match_term(lists, needed, restrict)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {d: totals[d] + s for d, s in scores.items() if d in totals}
+                if not totals:
+                    return []
+
+        ranked = sorted(totals.items(), key=lambda x: x[1], reverse=True)
+        return ranked[:limit or None]
+
+
+class ProductSearch:
+    """Process-wide product search engine"""
+
+    _index = None
+    _built_at = 0
+    _building = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _build():
+        """Build a fresh trigram index and swap it in"""
+        try:
+            db = get_database()
+            index = TrigramIndex()
+            projection = {field: 1 for field in TRIGRAM_FIELDS}
+            for doc in db.products.find({}, projection).batch_size(5000):
+                index.add(doc)
+            ProductSearch._index = index
+            ProductSearch._built_at = time.time()
+        except Exception as e:
+            print(f"⚠️ Warning: Could not build search index: {e}")
+        finally:
+            ProductSearch._building = False
+
+    @staticmethod
+    def _get_index():
+        """
+        Return the trigram index, (re)building it in the background on
+        first use or once it is too old. Returns None until the first
+        build completes; callers then fall back to the text index.
+        """
+        stale = time.time() - ProductSearch._built_at > INDEX_MAX_AGE
+        if stale and not ProductSearch._building:
+            with ProductSearch._lock:
+                if not ProductSearch._building:
+                    ProductSearch._building = True
+                    threading.Thread(target=ProductSearch._build, daemon=True).start()
+        return ProductSearch._index
+
+    @staticmethod
+    def refresh_product(product_id):
+        """Re-index a single product after a write"""
+        if ProductSearch._index is None:
+            return
+        db = get_database()
+        projection = {field: 1 for field in TRIGRAM_FIELDS}
+        doc = db.products.find_one({"_id": ObjectId(str(product_id))}, projection)
+        if doc:
+            ProductSearch._index.add(doc)
+        else:
+            ProductSearch._index.remove(product_id)
+
+    @staticmethod
+    def index_product(doc):
+        """Index a product document that is already in hand"""
+        if ProductSearch._index is not None:
+            ProductSearch._index.add(doc)
+    
+    @staticmethod
+    def remove_product(product_id):
+        """Drop a deleted product from the index"""
+        if ProductSearch._index is not None:
+            ProductSearch._index.remove(product_id)
+
+    @staticmethod
+    def _text_search(query, limit):
+        """
+        Weighted MongoDB text search; returns {doc_id: score}
+        Every term is quoted so, like the trigram index, all must match
+        """
+        db = get_database()
+        phrase_query = " ".join(f'"{term}"' for term in tokenize(query))
+        try:
+            cursor = db.products.find(
+                {"$text": {"$search": phrase_query}},
+                {"score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+            return {str(doc['_id']): doc['score'] for doc in cursor}
+        except Exception:
+            # Text index not built yet
+            return {}
+
+    @staticmethod
+    def search(query, limit=50):
+        """
+        Search products
+
+        Args:
+            query: Free text (name, SKU, category, description)
+            limit: Maximum number of results (0 = no limit)
+
+        Returns:
+            List of (product_id, score), best first
+        """
+        if not tokenize(query):
+            return []
+
+        # Exact SKU hits are a unique index lookup and always rank first
+        db = get_database()
+        exact = db.products.find_one({"sku": query.strip().upper()}, {"_id": 1})
+        if exact:
+            return [(str(exact['_id']), float('inf'))]
+
+        index = ProductSearch._get_index()
+        scores = dict(index.search(query, limit)) if index is not None else {}
+
+        # Text scores are already weighted per field; scale them into the
+        # same range as trigram scores so either source can win
+        max_weight = max(FIELD_WEIGHTS.values())
+        for doc_id, score in ProductSearch._text_search(query, limit).items():
+            scores[doc_id] = scores.get(doc_id, 0) + min(score, max_weight)
+
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return ranked[:limit or None]
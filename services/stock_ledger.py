@@ -0,0 +1,232 @@
+"""
+Stock Ledger - historical stock levels from movements and snapshots
+Periodic per-product snapshots bound how many movements have to be
+replayed: stock at time T is the latest snapshot at or before T plus
+the movements between the two, both found by index seeks on
+(product_id, timestamp).
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+from bson import ObjectId
+from config.database import get_database, run_in_transaction
+from models.product import CURRENT_STOCK, Product
+
+# Seconds between snapshot rounds (0 disables the in-app scheduler)
+SNAPSHOT_INTERVAL = int(os.getenv("STOCK_SNAPSHOT_INTERVAL", 86400))
+
+# Snapshots are stamped this far in the past so movements stamped just
+# before that moment have committed by the time the ledger is summed
+# (transactions are aborted after 60 seconds)
+SNAPSHOT_LAG = timedelta(minutes=2)
+
+
+class StockLedger:
+    """Point-in-time stock queries over stock_movements"""
+
+    @staticmethod
+    def take_snapshots():
+        """
+        Record the stock of every product at one moment, built from the
+        ledger so each snapshot matches its timestamp exactly: the
+        previous snapshot plus the movements up to that moment. Products
+        without movements since the previous round keep their older
+        snapshot, which is still exact.
+
+        Returns:
+            Timestamp stored on the snapshots
+        """
+        db = get_database()
+        # App timestamps are naive local time, so stamp snapshots the same way
+        now = datetime.now() - SNAPSHOT_LAG
+        last = db.stock_snapshots.find_one({}, {"timestamp": 1}, sort=[("timestamp", -1)])
+        window = {"$lte": now}
+        if last:
+            window["$gt"] = last['timestamp']
+
+        # Roll snapshotted products forward by their movements in the window
+        db.stock_movements.aggregate([
+            {"$match": {"timestamp": window}},
+            {"$group": {"_id": "$product_id", "change": {"$sum": "$quantity_change"}}},
+            {"$lookup": {
+                "from": "stock_snapshots",
+                "let": {"pid": "$_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$product_id", "$$pid"]}}},
+                    {"$sort": {"timestamp": -1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "stock": 1}}
+                ],
+                "as": "previous"
+            }},
+            {"$match": {"previous.0": {"$exists": True}}},
+            {"$project": {
+                "_id": 0,
+                "product_id": "$_id",
+                "stock": {"$add": [{"$first": "$previous.stock"}, "$change"]},
+                "timestamp": {"$literal": now}
+            }},
+            {"$merge": {"into": "stock_snapshots", "whenNotMatched": "insert"}}
+        ])
+
+        StockLedger._seed_snapshots(now)
+        return now
+
+    @staticmethod
+    def _seed_snapshots(now):
+        """
+        First snapshot for products that have none yet: the current level
+        minus the movements after `now`. Both are read in one transaction
+        (a single consistent view) on replica sets, so a concurrent sale
+        cannot be counted in one read and missed in the other.
+        """
+        db = get_database()
+        product_ids = [
+            p['_id'] for p in db.products.aggregate([
+                {"$lookup": {
+                    "from": "stock_snapshots",
+                    "localField": "_id",
+                    "foreignField": "product_id",
+                    "pipeline": [{"$limit": 1}, {"$project": {"_id": 1}}],
+                    "as": "snapshot"
+                }},
+                {"$match": {"snapshot.0": {"$exists": False}}},
+                {"$project": {"_id": 1}}
+            ])
+        ]
+        if not product_ids:
+            return
+
+        def seed(session):
+            later = {
+                row['_id']: row['change'] for row in db.stock_movements.aggregate([
+                    {"$match": {"product_id": {"$in": product_ids}, "timestamp": {"$gt": now}}},
+                    {"$group": {"_id": "$product_id", "change": {"$sum": "$quantity_change"}}}
+                ], session=session)
+            }
+            docs = [
+                {"product_id": p['_id'], "stock": p['stock'] - later.get(p['_id'], 0), "timestamp": now}
+                for p in db.products.find({"_id": {"$in": product_ids}}, {"stock": CURRENT_STOCK}, session=session)
+            ]
+            if docs:
+                db.stock_snapshots.insert_many(docs, session=session)
+
+        run_in_transaction(seed)
+
+    @staticmethod
+    def _movement_sum(product_id, start=None, end=None, workload="analytics"):
+        """Sum of quantity changes with start < timestamp <= end"""
+        db = get_database(workload)
+        window = {}
+        if start is not None:
+            window["$gt"] = start
+        if end is not None:
+            window["$lte"] = end
+        match = {"product_id": ObjectId(product_id)}
+        if window:
+            match["timestamp"] = window
+
+        return StockLedger._sum(db, match)
+
+    @staticmethod
+    def _sum(db, match):
+        """Server-side sum of quantity_change over matching movements"""
+        result = list(db.stock_movements.aggregate([
+            {"$match": match},
+            {"$group": {"_id": None, "total": {"$sum": "$quantity_change"}}}
+        ]))
+        return result[0]['total'] if result else 0
+
+    @staticmethod
+    def stock_at(product_id, at, workload="analytics"):
+        """
+        Stock level of a product at a past moment
+
+        Args:
+            product_id: Product ID
+            at: datetime (naive local time, like stored timestamps)
+            workload: Client to read through; the snapshot and the movement
+                      sum always come from the same one
+
+        Returns:
+            Stock quantity, or None if the product does not exist
+        """
+        db = get_database(workload)
+        snapshot = db.stock_snapshots.find_one(
+            {"product_id": ObjectId(product_id), "timestamp": {"$lte": at}},
+            sort=[("timestamp", -1)]
+        )
+        if snapshot:
+            return snapshot['stock'] + StockLedger._movement_sum(product_id, snapshot['timestamp'], at, workload)
+
+        # No snapshot yet: walk back from the current level instead, which
+        # also works for products created before movements were logged
+        product = db.products.find_one({"_id": ObjectId(product_id)}, {"stock": CURRENT_STOCK})
+        if not product:
+            return None
+        return product['stock'] - StockLedger._movement_sum(product_id, start=at, workload=workload)
+
+    @staticmethod
+    def history(product_id, page_size=50, after=None):
+        """
+        One page of a product's movements, newest first, with the stock
+        level after each movement
+
+        Returns:
+            (movements, next_cursor) - next_cursor is None on the last page
+        """
+        movements, cursor = Product.get_stock_movements_page(product_id, page_size, after=after)
+        if movements:
+            # Same (primary) client as the page itself, so a lagging
+            # secondary cannot disagree with the movements shown
+            first = movements[0]
+            balance = StockLedger.stock_at(product_id, first['timestamp'], workload="oltp")
+            if balance is not None:
+                # stock_at counts every movement at that timestamp; those
+                # with a larger _id sort before `first` (earlier page)
+                balance -= StockLedger._sum(get_database(), {
+                    "product_id": ObjectId(product_id),
+                    "timestamp": first['timestamp'],
+                    "_id": {"$gt": first['_id']}
+                })
+            for movement in movements:
+                movement['balance'] = balance
+                if balance is not None:
+                    balance -= movement['quantity_change']
+        return movements, cursor
+
+
+_snapshot_thread = None
+_snapshot_lock = threading.Lock()
+
+
+def _run_snapshots(interval):
+    stop_event = threading.Event()
+    while not stop_event.is_set():
+        try:
+            StockLedger.take_snapshots()
+        except Exception as e:
+            print(f"⚠️ Warning: stock snapshot failed: {e}")
+        stop_event.wait(interval)
+
+
+def start_background_snapshots(interval=SNAPSHOT_INTERVAL):
+    """
+    Start the in-app snapshot thread once per process
+    Safe to call on every Streamlit rerun
+    """
+    global _snapshot_thread
+
+    if interval <= 0:
+        return None
+
+    with _snapshot_lock:
+        if _snapshot_thread is None or not _snapshot_thread.is_alive():
+            _snapshot_thread = threading.Thread(
+                target=_run_snapshots,
+                args=(interval,),
+                name="stock-snapshots",
+                daemon=True
+            )
+            _snapshot_thread.start()
+    return _snapshot_thread
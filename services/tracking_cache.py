@@ -0,0 +1,134 @@
+"""
+Tracking Cache - stored carrier results with per-status TTLs
+Final statuses are never refetched, active ones refresh on a schedule
+that depends on how fast they change, and stale entries are served
+immediately while a background refresh runs.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pymongo import UpdateOne
+from config.database import get_database
+from services.tracking_service import TrackingService
+
+# Seconds before a cached result is refreshed (None = never)
+STATUS_TTLS = {
+    "Delivered": None,
+    "Expired": None,
+    "In Transit": 30 * 60,
+    "Exception": 5 * 60,
+}
+DEFAULT_TTL = 15 * 60
+
+# Lookup failures are not worth caching
+UNCACHED_STATUSES = ("Connection Error", "API Error")
+
+
+class TrackingCache:
+    """Tracking results cached in MongoDB by (tracking_number, carrier)"""
+
+    _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tracking-revalidate")
+    _in_flight = set()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def key(tracking_number, carrier):
+        return f"{carrier}|{tracking_number}"
+
+    @staticmethod
+    def ttl_for(status):
+        """Refresh interval in seconds for a status (None = never)"""
+        return STATUS_TTLS.get(status, DEFAULT_TTL)
+
+    @staticmethod
+    def is_fresh(entry, now=None):
+        """Whether a cache entry is still within its TTL"""
+        ttl = TrackingCache.ttl_for(entry['status'])
+        if ttl is None:
+            return True
+        now = now or datetime.now()
+        return (now - entry['fetched_at']).total_seconds() < ttl
+
+    @staticmethod
+    def get_entries(items):
+        """
+        Fetch cache entries for many packages in one query
+
+        Args:
+            items: List of (tracking_number, carrier)
+
+        Returns:
+            Dict of key -> entry {status, info, fetched_at}
+        """
+        db = get_database()
+        keys = [TrackingCache.key(number, carrier) for number, carrier in items]
+        # Mock entries stored by older versions never count as cached
+        query = {"_id": {"$in": keys}, "info.is_mock": {"$ne": True}}
+        return {entry['_id']: entry for entry in db.tracking_cache.find(query)}
+
+    @staticmethod
+    def put_many(infos):
+        """
+        Store tracking info dicts (as returned by TrackingService)
+        Lookup failures and mock results are never stored
+        """
+        now = datetime.now()
+        ops = [
+            UpdateOne(
+                {"_id": TrackingCache.key(info['tracking_number'], info['carrier'])},
+                {"$set": {
+                    "tracking_number": info['tracking_number'],
+                    "carrier": info['carrier'],
+                    "status": info['status'],
+                    "info": info,
+                    "fetched_at": now
+                }},
+                upsert=True
+            )
+            for info in infos
+            if info['status'] not in UNCACHED_STATUSES and not info.get('is_mock')
+        ]
+        if ops:
+            get_database().tracking_cache.bulk_write(ops, ordered=False)
+
+    @staticmethod
+    def _revalidate(tracking_number, carrier):
+        """Refetch one entry in the background"""
+        key = TrackingCache.key(tracking_number, carrier)
+        try:
+            TrackingCache.put_many([TrackingService.get_tracking_info(tracking_number, carrier)])
+        except Exception as e:
+            print(f"⚠️ Warning: tracking revalidation failed for {tracking_number}: {e}")
+        finally:
+            with TrackingCache._lock:
+                TrackingCache._in_flight.discard(key)
+
+    @staticmethod
+    def get_tracking_info(tracking_number, carrier, force=False):
+        """
+        Get tracking info, served from cache when possible
+
+        Fresh entries are returned as-is. Stale entries are returned
+        immediately while a background refresh runs. Missing entries
+        (or force=True) are fetched synchronously.
+
+        Returns:
+            Tracking info dict with extra keys fetched_at and is_stale
+        """
+        key = TrackingCache.key(tracking_number, carrier)
+        entry = None if force else TrackingCache.get_entries([(tracking_number, carrier)]).get(key)
+
+        if entry is None:
+            info = TrackingService.get_tracking_info(tracking_number, carrier)
+            TrackingCache.put_many([info])
+            return {**info, "fetched_at": datetime.now(), "is_stale": False}
+
+        stale = not TrackingCache.is_fresh(entry)
+        if stale:
+            with TrackingCache._lock:
+                schedule = key not in TrackingCache._in_flight
+                TrackingCache._in_flight.add(key)
+            if schedule:
+                TrackingCache._executor.submit(TrackingCache._revalidate, tracking_number, carrier)
+
+        return {**entry['info'], "fetched_at": entry['fetched_at'], "is_stale": stale}
@@ -0,0 +1,187 @@
+"""
+Background Tracking Poller
+Refreshes package status from the carrier API in batches, with bounded
+concurrency and a rate limit, and stores the results on the package
+documents so the Packages page never blocks on carrier calls.
+
+Run standalone with:  python -m services.tracking_poller
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from models.package import Package
+from services.tracking_service import TrackingService
+from services.tracking_cache import UNCACHED_STATUSES, TrackingCache
+
+# Seconds between polling rounds (0 disables the in-app poller)
+POLL_INTERVAL = int(os.getenv("TRACKING_POLL_INTERVAL", 1800))
+POLL_WORKERS = int(os.getenv("TRACKING_POLL_WORKERS", 4))
+POLL_RATE = float(os.getenv("TRACKING_POLL_RATE", 3))  # requests per second
+
+# Carrier failures say nothing about the package; never store them as its status
+FAILED_STATUSES = UNCACHED_STATUSES + ("Rejected/Invalid",)
+
+
+class RateLimiter:
+    """Token bucket shared by all poller workers"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TrackingPoller:
+    """Polls carrier tracking for all open packages"""
+
+    def __init__(self, batch_size=TrackingService.BATCH_SIZE, max_workers=POLL_WORKERS, rate=POLL_RATE):
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+
+    def poll_packages(self, packages, force=False):
+        """
+        Refresh tracking for the given packages
+
+        Packages whose cached carrier result is still fresh for its
+        status are skipped unless force=True.
+
+        Args:
+            packages: Package documents with _id, tracking_number, carrier,
+                      status and last_event
+            force: Ignore the tracking cache
+
+        Returns:
+            Number of packages whose status changed
+        """
+        packages = [p for p in packages if p.get('tracking_number')]
+        if not force and packages:
+            entries = TrackingCache.get_entries(
+                [(p['tracking_number'], p.get('carrier', 'Unknown')) for p in packages]
+            )
+            packages = [
+                p for p in packages
+                if not (entry := entries.get(TrackingCache.key(p['tracking_number'], p.get('carrier', 'Unknown'))))
+                or not TrackingCache.is_fresh(entry)
+            ]
+        batches = [packages[i:i + self.batch_size] for i in range(0, len(packages), self.batch_size)]
+        if not batches:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            return sum(executor.map(self._poll_batch, batches))
+
+    def poll_once(self):
+        """Refresh every package that has not reached a final status"""
+        return self.poll_packages(Package.get_packages_to_track())
+
+    def _poll_batch(self, packages):
+        """Fetch one carrier batch and write the results back"""
+        self.limiter.acquire()
+        try:
+            infos = TrackingService.get_tracking_batch(
+                [(p['tracking_number'], p.get('carrier', 'Unknown')) for p in packages]
+            )
+        except Exception as e:
+            print(f"⚠️ Warning: tracking batch failed: {e}")
+            return 0
+
+        # Mock data is for interactive demos only and is never persisted
+        infos = {number: info for number, info in infos.items() if not info.get('is_mock')}
+        TrackingCache.put_many(infos.values())
+
+        changed = 0
+        unchanged = []
+        for package in packages:
+            info = infos.get(package['tracking_number'])
+            if not info:
+                continue
+            if info['status'] in FAILED_STATUSES:
+                unchanged.append(package['_id'])
+                continue
+
+            latest = info['history'][0] if info.get('history') else {}
+            last_event = package.get('last_event') or {}
+            if info['status'] == package.get('status') and latest.get('details') == last_event.get('details'):
+                unchanged.append(package['_id'])
+                continue
+
+            Package.update_status(
+                package['_id'],
+                info['status'],
+                location=latest.get('location'),
+                details=latest.get('details'),
+                estimated_delivery=info.get('estimated_delivery')
+            )
+            changed += 1
+
+        if unchanged:
+            Package.mark_checked(unchanged)
+        return changed
+
+    def run_forever(self, interval=POLL_INTERVAL, stop_event=None):
+        """Poll every `interval` seconds until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                changed = self.poll_once()
+                if changed:
+                    print(f"🛰️ Tracking poller updated {changed} package(s)")
+            except Exception as e:
+                print(f"⚠️ Warning: tracking poll failed: {e}")
+            stop_event.wait(interval)
+
+
+_poller_thread = None
+_poller_lock = threading.Lock()
+
+
+def start_background_poller(interval=POLL_INTERVAL):
+    """
+    Start the in-app poller thread once per process
+    Safe to call on every Streamlit rerun; does nothing without a
+    carrier API key (mock tracking)
+    """
+    global _poller_thread
+
+    if interval <= 0 or TrackingService._use_mock():
+        return None
+
+    with _poller_lock:
+        if _poller_thread is None or not _poller_thread.is_alive():
+            _poller_thread = threading.Thread(
+                target=TrackingPoller().run_forever,
+                kwargs={"interval": interval},
+                name="tracking-poller",
+                daemon=True
+            )
+            _poller_thread.start()
+    return _poller_thread
+
+
+if __name__ == "__main__":
+    from config.database import init_db
+
+    if TrackingService._use_mock():
+        print("❌ No carrier API key configured (TRACKING_API_KEY); nothing to poll")
+        raise SystemExit(1)
+
+    init_db()
+    print(f"🛰️ Tracking poller running every {POLL_INTERVAL}s")
+    TrackingPoller().run_forever(interval=POLL_INTERVAL or 60)
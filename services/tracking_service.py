@@ -6,7 +6,6 @@ Supports 17TRACK (Real Implementation) and EasyPost (Mock)
 import requests
 import os
 import random
-import json
 from datetime import datetime
 
 class TrackingService:
@@ -14,6 +13,31 @@ class TrackingService:
     
     API_KEY = os.getenv("TRACKING_API_KEY", "")
     PROVIDER = os.getenv("TRACKING_PROVIDER", "17TRACK")
+    # Override to point at a local mock 17TRACK server
+    API_URL = os.getenv("TRACKING_API_URL", "https://api.17track.net/track/v2.2/gettrackinfo")
+    
+    # 17TRACK accepts up to 40 numbers per gettrackinfo call
+    BATCH_SIZE = 40
+    REQUEST_TIMEOUT = 15
+    
+    # Map 17TRACK status to our status
+    # 0:Not Found, 10:Transit, 20:Expired, 30:Ready, 35:Out for Delivery, 
+    # 40:Failed Attempt, 50:Delivered, 60:Exception
+    STATUS_MAP = {
+        0: "Not Found",
+        10: "In Transit",
+        20: "Expired",
+        30: "Ready for Pickup",
+        35: "Out for Delivery",
+        40: "Delivery Failed",
+        50: "Delivered",
+        60: "Exception"
+    }
+    
+    @staticmethod
+    def _use_mock():
+        return (not TrackingService.API_KEY or TrackingService.API_KEY == "mock_key"
+                or TrackingService.PROVIDER != "17TRACK")
     
     @staticmethod
     def get_tracking_info(tracking_number, carrier):
@@ -21,13 +45,65 @@ class TrackingService:
         Get tracking information for a package
         Returns a dict with status and history
         """
-        if not TrackingService.API_KEY or TrackingService.API_KEY == "mock_key":
+        if TrackingService._use_mock():
             return TrackingService._get_mock_data(tracking_number, carrier)
             
-        if TrackingService.PROVIDER == "17TRACK":
-            return TrackingService._get_17track_data(tracking_number, carrier)
-            
-        return TrackingService._get_mock_data(tracking_number, carrier)
+        return TrackingService._get_17track_data(tracking_number, carrier)
+    
+    @staticmethod
+    def get_tracking_batch(items):
+        """
+        Get tracking information for many packages
+        
+        Args:
+            items: List of (tracking_number, carrier), at most BATCH_SIZE
+        
+        Returns:
+            Dict of tracking_number -> tracking info dict
+        """
+        if TrackingService._use_mock():
+            return {number: TrackingService._get_mock_data(number, carrier) for number, carrier in items}
+        
+        return TrackingService._get_17track_batch(items)
+
+    @staticmethod
+    def _error_info(tracking_number, carrier, status, details):
+        """Tracking info dict describing a failed lookup"""
+        return {
+            "tracking_number": tracking_number,
+            "carrier": carrier,
+            "status": status,
+            "estimated_delivery": "N/A",
+            "history": [{"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "status": "Error" if status != "No Info Available" else "Info", "details": details}],
+            "is_mock": False
+        }
+
+    @staticmethod
+    def _parse_track(tracking_number, carrier, track_info):
+        """Convert a 17TRACK track object into our tracking info dict"""
+        current_status_code = track_info['z0']['z']
+        current_status = TrackingService.STATUS_MAP.get(current_status_code, "Unknown")
+        
+        # Events history
+        events = []
+        # z1 is the list of events (latest first usually, or we sort)
+        raw_events = track_info.get('z1', [])
+        for e in raw_events:
+            events.append({
+                "timestamp": e.get('a', ''), # Time
+                "status": e.get('z', ''),    # Status description
+                "location": e.get('c', '') + ", " + e.get('d', ''), # Location
+                "details": e.get('z', '')
+            })
+        
+        return {
+            "tracking_number": tracking_number,
+            "carrier": carrier,
+            "status": current_status,
+            "estimated_delivery": track_info.get('z0', {}).get('e', 'N/A'),
+            "history": events,
+            "is_mock": False
+        }
 
     @staticmethod
     def _get_17track_data(tracking_number, carrier):
@@ -35,111 +111,65 @@ class TrackingService:
         Fetch real tracking data from 17TRACK API v2.4
         Docs: https://api.17track.net/en/doc/v2/4
         """
-        url = "https://api.17track.net/track/v2.2/gettrackinfo"
+        return TrackingService._get_17track_batch([(tracking_number, carrier)])[tracking_number]
+
+    @staticmethod
+    def _get_17track_batch(items):
+        """
+        Fetch tracking data for up to BATCH_SIZE numbers in one call
+        
+        Returns:
+            Dict of tracking_number -> tracking info dict (every input
+            number is present, with an error status if it failed)
+        """
         headers = {
             "17token": TrackingService.API_KEY,
             "Content-Type": "application/json"
         }
-        
-        # 17TRACK requires a list of items. We only query one.
-        payload = [
-            {
-                "number": tracking_number
-            }
-        ]
+        carriers = dict(items)
         
         # If carrier is known, we can add it, but 17TRACK auto-detects nicely.
-        # payload[0]["carrier"] = _map_carrier_code(carrier) 
+        payload = [{"number": number} for number in carriers]
         
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = requests.post(TrackingService.API_URL, headers=headers, json=payload,
+                                     timeout=TrackingService.REQUEST_TIMEOUT)
             data = response.json()
-            
-            if data['code'] == 0:
-                # Success - Check if accepted
-                accepted = data['data'].get('accepted', [])
-                rejected = data['data'].get('rejected', [])
-                
-                if accepted:
-                    track_info = accepted[0]['track']
-                    
-                    # Map 17TRACK status to our status
-                    # 0:Not Found, 10:Transit, 20:Expired, 30:Ready, 35:Out for Delivery, 
-                    # 40:Failed Attempt, 50:Delivered, 60:Exception
-                    status_map = {
-                        0: "Not Found",
-                        10: "In Transit",
-                        20: "Expired",
-                        30: "Ready for Pickup",
-                        35: "Out for Delivery",
-                        40: "Delivery Failed",
-                        50: "Delivered",
-                        60: "Exception"
-                    }
-                    
-                    current_status_code = track_info['z0']['z']
-                    current_status = status_map.get(current_status_code, "Unknown")
-                    
-                    # Events history
-                    events = []
-                    # z1 is the list of events (latest first usually, or we sort)
-                    raw_events = track_info.get('z1', [])
-                    for e in raw_events:
-                        events.append({
-                            "timestamp": e.get('a', ''), # Time
-                            "status": e.get('z', ''),    # Status description
-                            "location": e.get('c', '') + ", " + e.get('d', ''), # Location
-                            "details": e.get('z', '')
-                        })
-                    
-                    return {
-                        "tracking_number": tracking_number,
-                        "carrier": carrier,
-                        "status": current_status,
-                        "estimated_delivery": track_info.get('z0', {}).get('e', 'N/A'),
-                        "history": events,
-                        "is_mock": False
-                    }
-                elif rejected:
-                    # Number was rejected by 17TRACK (e.g. invalid number, carrier not supported, duplicates etc)
-                    error_msg = rejected[0].get('message', 'Tracking number rejected by carrier')
-                    return {
-                        "tracking_number": tracking_number,
-                        "carrier": carrier,
-                        "status": "Rejected/Invalid",
-                        "estimated_delivery": "N/A",
-                        "history": [{"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "status": "Error", "details": f"17TRACK Error: {error_msg}"}],
-                        "is_mock": False
-                    }
-                else:
-                    return {
-                        "tracking_number": tracking_number,
-                        "carrier": carrier,
-                        "status": "No Info Available",
-                        "estimated_delivery": "N/A",
-                        "history": [{"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "status": "Info", "details": "Tracking number accepted but no data yet."}],
-                        "is_mock": False
-                    }
-            else:
-                # API Error or No Data (e.g. number not registered yet)
-                return {
-                    "tracking_number": tracking_number,
-                    "carrier": carrier,
-                    "status": "API Error",
-                    "estimated_delivery": "N/A",
-                    "history": [{"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "status": "Error", "details": data.get('message', 'Unknown API Error')}],
-                    "is_mock": False
-                }
-                
         except Exception as e:
-            return {
-                "tracking_number": tracking_number,
-                "carrier": carrier,
-                "status": "Connection Error",
-                "estimated_delivery": "N/A",
-                "history": [{"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "status": "Error", "details": str(e)}],
-                "is_mock": False
-            }
+            return {number: TrackingService._error_info(number, carrier, "Connection Error", str(e))
+                    for number, carrier in carriers.items()}
+        
+        if data.get('code') != 0:
+            # API Error or No Data (e.g. number not registered yet)
+            message = data.get('message', 'Unknown API Error')
+            return {number: TrackingService._error_info(number, carrier, "API Error", message)
+                    for number, carrier in carriers.items()}
+        
+        results = {}
+        for entry in data['data'].get('accepted', []):
+            number = entry.get('number')
+            if number in carriers:
+                try:
+                    results[number] = TrackingService._parse_track(number, carriers[number], entry['track'])
+                except (KeyError, TypeError):
+                    results[number] = TrackingService._error_info(
+                        number, carriers[number], "No Info Available", "Tracking number accepted but no data yet.")
+        
+        for entry in data['data'].get('rejected', []):
+            # Number was rejected by 17TRACK (e.g. invalid number, carrier not supported, duplicates etc)
+            number = entry.get('number')
+            if number in carriers:
+                error = entry.get('error') or {}
+                error_msg = entry.get('message') or error.get('message') or 'Tracking number rejected by carrier'
+                results[number] = TrackingService._error_info(
+                    number, carriers[number], "Rejected/Invalid", f"17TRACK Error: {error_msg}")
+        
+        for number, carrier in carriers.items():
+            if number not in results:
+                results[number] = TrackingService._error_info(
+                    number, carrier, "No Info Available", "Tracking number accepted but no data yet.")
+        
+        return results
 
     @staticmethod
     def _get_mock_data(tracking_number, carrier):
@@ -150,15 +180,16 @@ class TrackingService:
         current_status = "In Transit" # Default
         if "DEL" in tracking_number: current_status = "Delivered"
         
-        random.seed(tracking_number)
+        # Seeded per number without touching the global random state
+        rng = random.Random(tracking_number)
         
         history = []
         for i in range(3):
             history.append({
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "status": random.choice(statuses),
-                "location": random.choice(locations),
-                "details": f"Package processed at {random.choice(locations)} facility"
+                "status": rng.choice(statuses),
+                "location": rng.choice(locations),
+                "details": f"Package processed at {rng.choice(locations)} facility"
             })
             
         return {
@@ -1,10 +1,143 @@
 
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 
-def generate_demand_forecast(sales_orders, products):
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def build_demand_matrix(records, start=None, end=None):
+    """
+    Build a SKU x day demand matrix in one pass
+    
+    Args:
+        records: DataFrame (or list of dicts) with product_id, date, quantity
+        start: First day of the matrix (defaults to the earliest record)
+        end: Last day of the matrix (defaults to the latest record)
+    
+    Returns:
+        (matrix, product_ids, days) - float32 array of shape
+        (len(product_ids), len(days)), the product ids labelling the rows
+        and the DatetimeIndex labelling the columns
+    """
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+    if df.empty:
+        return np.zeros((0, 0), dtype=np.float32), pd.Index([]), pd.DatetimeIndex([])
+    
+    dates = pd.to_datetime(df['date']).dt.normalize()
+    start = pd.Timestamp(start).normalize() if start is not None else dates.min()
+    end = pd.Timestamp(end).normalize() if end is not None else dates.max()
+    days = pd.date_range(start, end, freq="D")
+    
+    in_range = ((dates >= start) & (dates <= end)).to_numpy()
+    sku_index, product_ids = pd.factorize(df['product_id'].astype(str).to_numpy()[in_range])
+    day_index = ((dates[in_range] - start).dt.days).to_numpy()
+    quantities = pd.to_numeric(df['quantity'], errors='coerce').fillna(0).to_numpy()[in_range]
+    
+    # Sum repeated (sku, day) pairs, then scatter into the matrix
+    grouped = pd.Series(quantities).groupby([sku_index, day_index]).sum()
+    matrix = np.zeros((len(product_ids), len(days)), dtype=np.float32)
+    matrix[grouped.index.get_level_values(0), grouped.index.get_level_values(1)] = grouped.to_numpy()
+    return matrix, pd.Index(product_ids), days
+
+
+def forecast_demand(matrix, product_ids, days, horizon=30, window=28, alpha=0.3):
+    """
+    Forecast demand for every SKU at once
+    
+    Combines a simple moving average, simple exponential smoothing and a
+    day-of-week seasonal index; the forecast is the smoothed daily level
+    scaled by the seasonal index of each future day.
+    
+    Args:
+        matrix, product_ids, days: Output of build_demand_matrix
+        horizon: Days to forecast
+        window: Moving average window in days
+        alpha: Exponential smoothing factor (0-1)
+    
+    Returns:
+        DataFrame indexed by product_id with total_sold, recent_daily_avg,
+        smoothed_daily, peak_weekday (None without a clear weekly pattern)
+        and forecast, sorted by forecast
+    """
+    columns = ["total_sold", "recent_daily_avg", "smoothed_daily", "peak_weekday", "forecast"]
+    n_skus, n_days = matrix.shape
+    if n_skus == 0 or n_days == 0:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name="product_id"))
+    
+    # Moving average over the last `window` days
+    sma = matrix[:, -window:].mean(axis=1)
+    
+    # Exponential smoothing as one weighted sum over the day axis:
+    # level = sum(alpha * (1 - alpha)^(T-1-t) * x_t), first day seeds the level
+    decay = (1 - alpha) ** np.arange(n_days - 1, -1, -1, dtype=np.float64)
+    weights = alpha * decay
+    weights[0] = decay[0]
+    smoothed = matrix @ weights.astype(np.float32)
+    
+    # Day-of-week index: mean demand per weekday relative to the overall mean
+    weekday = days.dayofweek.to_numpy()
+    one_hot = np.zeros((n_days, 7), dtype=np.float32)
+    one_hot[np.arange(n_days), weekday] = 1
+    day_counts = one_hot.sum(axis=0)
+    weekday_mean = (matrix @ one_hot) / np.maximum(day_counts, 1)
+    overall_mean = matrix.mean(axis=1, keepdims=True)
+    seasonal = np.where(
+        (overall_mean > 0) & (day_counts > 0),
+        weekday_mean / np.where(overall_mean > 0, overall_mean, 1),
+        1.0
+    )
+    
+    # Sum the seasonal index over the weekdays of the forecast horizon
+    future_weekdays = (days[-1] + pd.to_timedelta(np.arange(1, horizon + 1), unit="D")).dayofweek.to_numpy()
+    horizon_factor = seasonal[:, future_weekdays].sum(axis=1)
+    
+    # A busiest day needs at least one full week and some weekday variation
+    peak_weekday = np.array(WEEKDAYS, dtype=object)[seasonal.argmax(axis=1)]
+    flat = np.isclose(seasonal.max(axis=1), seasonal.min(axis=1))
+    if n_days < 7:
+        flat[:] = True
+    peak_weekday[flat] = None
+    
+    result = pd.DataFrame({
+        "total_sold": matrix.sum(axis=1),
+        "recent_daily_avg": sma,
+        "smoothed_daily": smoothed,
+        "peak_weekday": peak_weekday,
+        "forecast": np.round(smoothed.astype(np.float64) * horizon_factor, 1)
+    }, index=pd.Index(product_ids, name="product_id"))
+    return result.sort_values("forecast", ascending=False)
+
+
+def load_sales_history(start_date=None, end_date=None):
+    """
+    Daily units per product from the sales_daily rollup
+    
+    Returns:
+        DataFrame with product_id, date, quantity
     """
-    Generate simple demand forecast based on recent sales.
+    from config.database import get_database
+    from models.sales_rollup import SalesRollup
+    
+    db = get_database("analytics")
+    query = {"product_id": {"$ne": None}, **SalesRollup.day_range(start_date, end_date)}
+    rows = list(db.sales_daily.find(query, {"_id": 0, "product_id": 1, "date": 1, "units": 1}))
+    if not rows:
+        return pd.DataFrame(columns=["product_id", "date", "quantity"])
+    return pd.DataFrame(rows).rename(columns={"units": "quantity"})
+
+
+def forecast_from_history(days_back=365, horizon=30):
+    """Forecast every SKU from the last `days_back` days of the sales rollup"""
+    end = datetime.now()
+    start = end - timedelta(days=days_back)
+    matrix, product_ids, days = build_demand_matrix(load_sales_history(start, end), start, end)
+    return forecast_demand(matrix, product_ids, days, horizon=horizon)
+
+
+def generate_demand_forecast(sales_orders, products, horizon=30, limit=20):
+    """
+    Generate a demand forecast from sales orders.
     Returns a text summary for AI context.
     """
     try:
@@ -31,34 +164,19 @@ def generate_demand_forecast(sales_orders, products):
         if not sales_items:
             return "No items sold yet."
 
-        df = pd.DataFrame(sales_items)
+        matrix, product_ids, days = build_demand_matrix(sales_items)
+        forecast = forecast_demand(matrix, product_ids, days, horizon=horizon)
         
-        # Calculate total sales per product
-        # Group by product_id
-        summary = df.groupby('product_id')['quantity'].sum().reset_index()
+        names = {str(p.get('_id')): p.get('name') for p in products}
         
-        # Calculate time span (days between first and last order or just last 30 days)
-        # For simplicity, let's assume the data provided is "Recent" (e.g. last 30 days)
-        # In a real app we'd filter by date.
-        
-        forecast_text = "--- 🔮 DEMAND FORECAST (Next 30 Days) ---\n"
-        
-        for index, row in summary.iterrows():
-            pid = row['product_id']
-            qty_sold = row['quantity']
-            
-            # Find product name
-            product_name = "Unknown Product"
-            for p in products:
-                if str(p.get('_id')) == pid:
-                    product_name = p.get('name')
-                    break
-            
-            # Simple Naive Forecast: Assume next month = last month
-            # (In a real app, use moving average or linear regression)
-            predicted_demand = qty_sold 
-            
-            forecast_text += f"- {product_name}: Sold {qty_sold} recently. Est. Need: {predicted_demand}\n"
+        forecast_text = f"--- 🔮 DEMAND FORECAST (Next {horizon} Days) ---\n"
+        for pid, row in forecast.head(limit).iterrows():
+            product_name = names.get(pid, "Unknown Product")
+            peak = f" (busiest day: {row['peak_weekday']})" if pd.notna(row['peak_weekday']) else ""
+            forecast_text += (
+                f"- {product_name}: Sold {row['total_sold']:g} recently. "
+                f"Est. Need: {row['forecast']:g}{peak}\n"
+            )
             
         return forecast_text
 
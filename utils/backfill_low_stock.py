@@ -0,0 +1,27 @@
+"""
+Backfill / repair the materialized is_low_stock flag on products
+"""
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from config.database import init_db
+from models.product import Product
+
+
+def backfill_low_stock():
+    print("🔌 Connecting to database...")
+    init_db()
+    
+    print("🛠️ Recomputing 'is_low_stock' for all products...")
+    changed = Product.refresh_low_stock_flags()
+    print(f"   ✅ Updated {changed} product(s)")
+    
+    low_stock = Product.get_low_stock_items()
+    print(f"   📉 {len(low_stock)} product(s) currently at or below reorder level")
+    
+    print("\n✨ Low stock backfill completed!")
+
+
+if __name__ == "__main__":
+    backfill_low_stock()
@@ -0,0 +1,158 @@
+"""
+Benchmark concurrent checkouts against a local single-node replica set
+
+Start a throwaway replica set first:
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval "rs.initiate()"
+
+Then run (uses its own database, dropped at the start of every run):
+    MONGODB_URI="mongodb://localhost:27017/?replicaSet=rs0" python utils/benchmark_checkout.py --workers 16
+
+A few hot products with limited stock force write conflicts, so the
+numbers include transaction retries and stock-out rejections. The run
+ends by checking that no stock went negative and that stock, movements,
+bills and the sales rollup all agree.
+"""
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["DATABASE_NAME"] = os.getenv("BENCHMARK_DATABASE", "inventory_benchmark")
+
+from config.database import get_client, get_database, init_db, supports_transactions
+from models.product import InsufficientStockError
+from services.billing_service import BillingService
+
+
+def seed_products(count, stock):
+    """Insert benchmark products; returns their ids as strings"""
+    db = get_database()
+    docs = [
+        {
+            "sku": f"BENCH-{i:05d}",
+            "name": f"Benchmark Product {i}",
+            "category": f"Category {i % 5}",
+            "stock": stock,
+            "quantity": stock,
+            "price": 10.0 + i % 50,
+            "cost": 5.0,
+            "reorder_level": 0,
+            "is_low_stock": False
+        }
+        for i in range(count)
+    ]
+    result = db.products.insert_many(docs)
+    return [str(pid) for pid in result.inserted_ids]
+
+
+def run_worker(product_ids, hot_ids, checkouts, max_lines, seed):
+    """Run checkouts sequentially; returns (latencies, completed, rejected)"""
+    rng = random.Random(seed)
+    latencies, completed, rejected = [], 0, 0
+
+    for _ in range(checkouts):
+        picks = rng.sample(product_ids, rng.randint(1, max_lines - 1)) + [rng.choice(hot_ids)]
+        cart = []
+        for pid in dict.fromkeys(picks):
+            qty = rng.randint(1, 3)
+            cart.append({"product_id": pid, "name": pid, "sku": pid, "quantity": qty, "price": 10.0, "total": qty * 10.0})
+
+        start = time.perf_counter()
+        try:
+            BillingService.checkout(cart, "Benchmark", "0000000000", tax_rate=0.18)
+            completed += 1
+        except InsufficientStockError:
+            rejected += 1
+        latencies.append(time.perf_counter() - start)
+
+    return latencies, completed, rejected
+
+
+def verify(initial_stock, product_count):
+    """Check the invariants the transaction is meant to protect"""
+    db = get_database()
+    errors = []
+
+    negative = db.products.count_documents({"stock": {"$lt": 0}})
+    if negative:
+        errors.append(f"{negative} product(s) with negative stock")
+
+    sold_stock = product_count * initial_stock - sum(p['stock'] for p in db.products.find({}, {"stock": 1}))
+    sold_movements = -sum(m['quantity_change'] for m in db.stock_movements.find({"movement_type": "sale"}))
+    sold_bills = sum(item['quantity'] for b in db.bills.find({}, {"items": 1}) for item in b['items'])
+    rollup = next(db.sales_daily.aggregate([
+        {"$match": {"product_id": None}},
+        {"$group": {"_id": None, "units": {"$sum": "$units"}, "bills": {"$sum": "$bill_count"}}}
+    ]), {"units": 0, "bills": 0})
+
+    if not sold_stock == sold_movements == sold_bills == rollup['units']:
+        errors.append(
+            f"units disagree: stock {sold_stock}, movements {sold_movements}, "
+            f"bills {sold_bills}, rollup {rollup['units']}"
+        )
+    if rollup['bills'] != db.bills.count_documents({}):
+        errors.append("rollup bill count does not match bills")
+    return errors
+
+
+def benchmark_checkout(workers, checkouts, products, hot, stock, max_lines):
+    print("🔌 Connecting to database...")
+    db = get_database()
+    if not supports_transactions():
+        print("❌ Transactions need a replica set; see the instructions at the top of this file")
+        return
+
+    print(f"🧹 Resetting benchmark database '{db.name}'...")
+    get_client().drop_database(db.name)
+    init_db(force=True)
+
+    product_ids = seed_products(products, stock)
+    hot_ids = product_ids[:hot]
+    print(f"   ✅ Seeded {products} products ({hot} hot) with {stock} units each")
+
+    print(f"🏁 Running {workers} workers x {checkouts} checkouts...")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda seed: run_worker(product_ids, hot_ids, checkouts, max_lines, seed),
+            range(workers)
+        ))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for r in results for l in r[0])
+    completed = sum(r[1] for r in results)
+    rejected = sum(r[2] for r in results)
+
+    print(f"   Completed: {completed}  Rejected (stock-out): {rejected}")
+    print(f"   Throughput: {completed / elapsed:,.1f} checkouts/s over {elapsed:.1f}s")
+    print(f"   Latency p50: {statistics.median(latencies) * 1000:.1f} ms  "
+          f"p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms  "
+          f"max: {latencies[-1] * 1000:.1f} ms")
+
+    errors = verify(stock, products)
+    if errors:
+        for error in errors:
+            print(f"   ❌ {error}")
+    else:
+        print("   ✅ Stock, movements, bills and rollup are consistent")
+
+    print("\n✨ Checkout benchmark completed!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent checkouts")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--checkouts", type=int, default=200, help="Checkouts per worker")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--hot", type=int, default=5, help="Products in every cart")
+    parser.add_argument("--stock", type=int, default=1000)
+    parser.add_argument("--max-lines", type=int, default=5)
+    args = parser.parse_args()
+
+    benchmark_checkout(args.workers, args.checkouts, args.products, args.hot, args.stock, args.max_lines)
@@ -0,0 +1,149 @@
+"""
+In-process caching helpers
+A thread-safe TTL cache with hit/miss counters, plus topic-based change
+notifications so model write methods can invalidate dependent reads.
+"""
+import functools
+import threading
+import time
+from collections import defaultdict
+
+# Topic names used by the models: one per collection that is written
+TOPICS = ("products", "bills", "sales_orders", "purchase_orders", "suppliers", "invoices", "packages")
+
+_listeners = defaultdict(list)
+_listeners_lock = threading.Lock()
+
+# Named caches, reported by cache_stats()
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def subscribe(topic, callback):
+    """Call callback(topic) whenever notify_change(topic) is raised"""
+    with _listeners_lock:
+        _listeners[topic].append(callback)
+
+
+def notify_change(topic):
+    """Signal that documents under `topic` were written"""
+    with _listeners_lock:
+        callbacks = list(_listeners.get(topic, ()))
+    for callback in callbacks:
+        try:
+            callback(topic)
+        except Exception as e:
+            print(f"⚠️ Warning: cache invalidation for '{topic}' failed: {e}")
+
+
+class TTLCache:
+    """Thread-safe key/value cache with per-entry expiry"""
+
+    def __init__(self, ttl, name=None):
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        self._lock = threading.Lock()
+        if name:
+            with _registry_lock:
+                _registry.append(self)
+
+    def get(self, key):
+        """
+        Look up a key
+
+        Returns:
+            (found, value) - found is False for missing or expired entries
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, ttl=None):
+        """Store a value for `ttl` seconds (defaults to the cache TTL)"""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        """Hit/miss counters for this cache"""
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._data)
+        }
+
+
+def cache_stats():
+    """Hit/miss counters for every named cache"""
+    with _registry_lock:
+        caches = list(_registry)
+    return [cache.stats() for cache in caches]
+
+
+def _copy_result(value):
+    """Copy a cached result so callers can mutate what they get back"""
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, tuple):
+        return tuple(_copy_result(item) for item in value)
+    return value
+
+
+def cached_query(ttl, topics, name=None):
+    """
+    Cache a read-only model query per argument set
+
+    Entries expire after `ttl` seconds and are dropped whenever
+    notify_change is raised for any of `topics`.
+
+    Args:
+        ttl: Seconds to keep a result
+        topics: Topics whose writes invalidate the cache
+        name: Name reported by cache_stats (defaults to the function name)
+    """
+    def decorator(func):
+        cache = TTLCache(ttl, name=name or func.__qualname__)
+        generation = [0]
+
+        def invalidate(_topic):
+            generation[0] += 1
+            cache.invalidate()
+
+        for topic in topics:
+            subscribe(topic, invalidate)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = repr((args, sorted(kwargs.items())))
+            found, value = cache.get(key)
+            if not found:
+                started = generation[0]
+                value = func(*args, **kwargs)
+                # Don't store a result that a concurrent write already invalidated
+                if generation[0] == started:
+                    cache.set(key, value)
+            return _copy_result(value)
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
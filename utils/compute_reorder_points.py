@@ -0,0 +1,40 @@
+"""
+Compute dynamic reorder points and order quantities for all products
+Run periodically (e.g. nightly from cron):
+    python utils/compute_reorder_points.py --history-days 180 --service-level 0.95
+"""
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+from config.database import init_db
+from models.product import Product
+from services.reorder_planner import HISTORY_DAYS, SERVICE_LEVEL, ReorderPlanner
+
+
+def compute_reorder_points(history_days, service_level):
+    print("🔌 Connecting to database...")
+    init_db()
+    
+    print(f"📈 Computing reorder points from {history_days} days of sales...")
+    plan = ReorderPlanner.compute_plan(history_days, service_level)
+    print(f"   ✅ Planned {len(plan)} product(s) with sales history")
+    
+    print("💾 Writing reorder points...")
+    result = ReorderPlanner.apply_plan(plan)
+    print(f"   ✅ Modified {result['modified']} product(s)")
+    
+    low_stock = Product.get_low_stock_items()
+    print(f"   📉 {len(low_stock)} product(s) currently at or below reorder point")
+    
+    print("\n✨ Reorder planning completed!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute reorder points and order quantities")
+    parser.add_argument("--history-days", type=int, default=HISTORY_DAYS)
+    parser.add_argument("--service-level", type=float, default=SERVICE_LEVEL)
+    args = parser.parse_args()
+    
+    compute_reorder_points(args.history_days, args.service_level)
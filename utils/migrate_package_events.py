@@ -0,0 +1,42 @@
+"""
+Move embedded package tracking_history arrays into package_events
+"""
+import sys
+import os
+sys.path.append(os.getcwd())
+
+from pymongo import InsertOne
+from config.database import init_db, get_database
+
+
+def migrate_package_events(batch_size=500):
+    print("🔌 Connecting to database...")
+    init_db()
+    db = get_database()
+    
+    print("🛠️ Moving 'tracking_history' into 'package_events'...")
+    cursor = db.packages.find(
+        {"tracking_history": {"$exists": True}},
+        {"tracking_history": 1}
+    ).batch_size(batch_size)
+    
+    moved_packages = 0
+    moved_events = 0
+    for package in cursor:
+        ops = [
+            InsertOne({"package_id": package['_id'], **event})
+            for event in package.get('tracking_history') or []
+        ]
+        if ops:
+            db.package_events.bulk_write(ops, ordered=False)
+        # Unset only after the events are safely stored
+        db.packages.update_one({"_id": package['_id']}, {"$unset": {"tracking_history": ""}})
+        moved_packages += 1
+        moved_events += len(ops)
+    
+    print(f"   ✅ Moved {moved_events} event(s) from {moved_packages} package(s)")
+    print("\n✨ Package events migration completed!")
+
+
+if __name__ == "__main__":
+    migrate_package_events()
@@ -0,0 +1,53 @@
+"""
+Keyset (cursor) pagination helpers
+Cursors are opaque strings encoding the sort value and _id of the last
+document on a page, so the next page is an index range scan instead of
+a skip over every earlier row.
+"""
+import base64
+from bson import json_util
+
+
+def encode_cursor(value, doc_id):
+    """Encode a sort value and _id into an opaque cursor string"""
+    raw = json_util.dumps([value, doc_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor string back into (sort value, _id)"""
+    raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    value, doc_id = json_util.loads(raw)
+    return value, doc_id
+
+
+def keyset_sort(field, direction=-1):
+    """Sort specification with _id as the tiebreaker"""
+    return [(field, direction), ("_id", direction)]
+
+
+def keyset_filter(field, cursor, direction=-1):
+    """
+    Query filter selecting documents after a cursor
+    
+    Args:
+        field: Sort field the cursor was built from
+        cursor: Cursor string from a previous page
+        direction: 1 for ascending, -1 for descending
+    """
+    value, doc_id = decode_cursor(cursor)
+    op = "$gt" if direction > 0 else "$lt"
+    return {
+        "$or": [
+            {field: {op: value}},
+            {field: value, "_id": {op: doc_id}}
+        ]
+    }
+
+
+def next_cursor(docs, field, page_size):
+    """Cursor for the page after `docs`, or None if this was the last page"""
+    if not docs or len(docs) < page_size:
+        return None
+    last = docs[-1]
+    return encode_cursor(last.get(field), last['_id'])
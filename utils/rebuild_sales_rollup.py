@@ -0,0 +1,31 @@
+"""
+Rebuild the sales_daily rollup collection from raw bills
+"""
+import sys
+import os
+sys.path.append(os.getcwd())
+
+import argparse
+from config.database import init_db
+from models.bill import Bill
+
+
+def rebuild_sales_rollup(include_today):
+    print("🔌 Connecting to database...")
+    init_db()
+    
+    scope = "all days" if include_today else "days before today"
+    print(f"🛠️ Rebuilding 'sales_daily' from bills ({scope})...")
+    count = Bill.rebuild_sales_rollup(include_today=include_today)
+    print(f"   ✅ Wrote {count} rollup document(s)")
+    
+    print("\n✨ Sales rollup rebuild completed!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the sales_daily rollup")
+    parser.add_argument("--include-today", action="store_true",
+                        help="Also rebuild today's rows (only while no bills are being created)")
+    args = parser.parse_args()
+    
+    rebuild_sales_rollup(args.include_today)
@@ -23,7 +23,8 @@ forecast = generate_demand_forecast(mock_sales, mock_products)
 print("\n--- Generated Forecast ---")
 print(forecast)
 
-if "Widget A" in forecast and "Est. Need: 8" in forecast:
-    print("\nSUCCESS: Forecast calculation looks correct (5+3=8 for Widget A).")
+# One day of history: 5+3=8 units/day, flat seasonality -> 8 x 30 days
+if "Widget A: Sold 8 recently" in forecast and "Est. Need: 240" in forecast:
+    print("\nSUCCESS: Forecast calculation looks correct (5+3=8/day for Widget A).")
 else:
     print("\nFAIL: Forecast output unexpected.")
@@ -0,0 +1,38 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Force mock tracking regardless of the local .env
+os.environ["TRACKING_API_KEY"] = "mock_key"
+
+from config.database import get_database
+from services.tracking_cache import TrackingCache
+from services.tracking_service import TrackingService
+
+TRACKING_NUMBER = "VERIFY-MOCK-DEL-0001"
+CARRIER = "Unknown"
+
+print("Verifying that mock tracking results are not cached...")
+if not TrackingService._use_mock():
+    print("FAIL: TrackingService is not in mock mode")
+    exit(1)
+
+db = get_database()
+key = TrackingCache.key(TRACKING_NUMBER, CARRIER)
+db.tracking_cache.delete_one({"_id": key})
+
+info = TrackingCache.get_tracking_info(TRACKING_NUMBER, CARRIER)
+if not info.get('is_mock'):
+    print("FAIL: Expected a mock result to be returned to the caller")
+    exit(1)
+print(f"Mock result returned: {info['status']}")
+
+if db.tracking_cache.find_one({"_id": key}):
+    db.tracking_cache.delete_one({"_id": key})
+    print("FAIL: Mock result was written to tracking_cache")
+    exit(1)
+
+print("SUCCESS: Mock result returned but not persisted.")
+exit(0)
@@ -1,7 +1,8 @@
 
 import streamlit as st
 from models.bill import Bill
-from models.product import Product
+from models.product import Product, InsufficientStockError
+from services.billing_service import BillingService
 from datetime import datetime
 import pandas as pd
 from fpdf import FPDF
@@ -36,8 +37,8 @@ def show():
         if 'cart' not in st.session_state:
             st.session_state.cart = []
         
-        # Get all products
-        products = Product.get_all_products()
+        # Get all products (picker columns only)
+        products, _ = Product.list_products(fields=["name", "sku", "stock", "price"])
         product_options = [f"{p['name']} - {p['sku']} (Stock: {p.get('stock', 0)})" for p in products]
         
         if products:
@@ -134,27 +135,24 @@ def show():
                 if not customer_name or not customer_contact:
                     st.error("❌ Please enter customer name and contact")
                 else:
-                    # Create bill
-                    bill_id = Bill.create_bill(
-                        customer_name=customer_name,
-                        customer_contact=customer_contact,
-                        items=st.session_state.cart,
-                        tax_rate=tax_rate,
-                        discount=discount,
-                        created_by=st.session_state.user['id']
-                    )
+                    # Bill, stock deduction and movements in one transaction
+                    try:
+                        bill = BillingService.checkout(
+                            st.session_state.cart,
+                            customer_name=customer_name,
+                            customer_contact=customer_contact,
+                            tax_rate=tax_rate,
+                            discount=discount,
+                            created_by=st.session_state.user['id']
+                        )
+                    except InsufficientStockError as e:
+                        st.error(f"❌ {e}")
+                        bill = None
+                    except Exception as e:
+                        st.error(f"❌ Failed to generate bill: {e}")
+                        bill = None
                     
-                    if bill_id:
-                        # Update product quantities
-                        for item in st.session_state.cart:
-                            Product.update_stock(
-                                item['product_id'],
-                                -item['quantity'],
-                                "sale",
-                                f"Sold via bill {Bill.get_bill_by_id(bill_id)['bill_number']}"
-                            )
-                        
-                        bill = Bill.get_bill_by_id(bill_id)
+                    if bill:
                         st.success(f"✅ Bill generated successfully! Bill Number: {bill['bill_number']}")
                         
                         # Clear cart
@@ -164,8 +162,6 @@ def show():
                         generate_pdf_invoice(bill)
                         
                         st.rerun()
-                    else:
-                        st.error("❌ Failed to generate bill")
         else:
             st.info("🛒 Cart is empty. Add products to create a bill.")
     
@@ -134,7 +134,7 @@ def create_po_logic(data, supplier_name):
             "total": qty * price
         })
     
-    po_number = f"PO-AI-{datetime.now().strftime('%Y%m%d%H%M')}"
+    po_number = PurchaseOrder.generate_po_number()
     
     po_id = PurchaseOrder.create_po(
         po_number=po_number,
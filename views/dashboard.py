@@ -1,7 +1,6 @@
 
 import streamlit as st
-from models.product import Product
-from models.bill import Bill
+from services.dashboard_service import DashboardService
 import plotly.express as px
 
 def show():
@@ -11,23 +10,23 @@ def show():
     st.info("📍 Navigate to different sections using the sidebar.")
     st.markdown("---")
     
-    products = Product.get_all_products()
-    low_stock_items = Product.get_low_stock_items()
-    bills = Bill.get_all_bills(limit=10)
-    
-    total_products = len(products)
-    low_stock_count = len(low_stock_items)
-    total_inventory_value = sum(p.get('stock', 0) * p.get('price', 0) for p in products)
+    overview = DashboardService.get_overview()
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Products", total_products)
+        st.metric("Total Products", overview['total_products'])
     with col2:
-        st.metric("Low Stock", low_stock_count)
+        st.metric("Low Stock", overview['low_stock_count'])
     with col3:
-        st.metric("Inventory Value", f"₹{total_inventory_value:,.2f}")
+        st.metric("Inventory Value", f"₹{overview['inventory_value']:,.2f}")
     with col4:
-        st.metric("Total Bills", len(bills))
+        st.metric("Total Bills", overview['bill_count'])
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Revenue", f"₹{overview['total_revenue']:,.2f}")
+    with col2:
+        st.metric("Inventory Cost", f"₹{overview['inventory_cost']:,.2f}")
     
     st.markdown("---")
     st.subheader("⚡ Quick Actions")
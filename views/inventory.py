@@ -30,7 +30,9 @@ def show():
                     'Price': f"₹{p.get('price', 0.0):,.2f}",
                     'Cost': f"₹{p.get('cost', 0.0):,.2f}",
                     'Reorder Level': p.get('reorder_level', 10),
-                    'Status': '⚠️ Low Stock' if p.get('stock', 0) <= p.get('reorder_level', 10) else '✅ In Stock'
+                    'Reorder Point': p.get('reorder_point'),
+                    'Reorder Qty': p.get('reorder_quantity'),
+                    'Status': '⚠️ Low Stock' if p.get('stock', 0) <= p.get('reorder_point', p.get('reorder_level', 10)) else '✅ In Stock'
                 })
             
             df = pd.DataFrame(products_data)
@@ -91,13 +93,13 @@ def show():
                             
                             if st.form_submit_button("🔄 Adjust Stock", use_container_width=True):
                                 if adjustment != 0:
-                                    success = Product.update_stock(
+                                    new_quantity = Product.update_stock(
                                         str(product['_id']), 
                                         adjustment, 
                                         movement_type, 
                                         notes
                                     )
-                                    if success:
+                                    if new_quantity is not None:
                                         st.success(f"✅ Stock adjusted by {adjustment}")
                                         st.rerun()
                                     else:
@@ -157,7 +159,7 @@ def show():
                         name=name,
                         description=description,
                         category=category,
-                        stock=quantity,
+                        quantity=quantity,
                         unit=unit,
                         price=price,
                         cost=cost,
@@ -185,13 +187,11 @@ def show():
                                           ["All"] + Product.get_categories())
         
         # Apply filters
+        category = filter_category if filter_category != "All" else None
         if search_term:
-            filtered_products = Product.search_products(search_term)
+            filtered_products = Product.search_products(search_term, limit=0, category=category)
         else:
-            filtered_products = Product.get_all_products()
-        
-        if filter_category != "All":
-            filtered_products = [p for p in filtered_products if p['category'] == filter_category]
+            filtered_products = Product.get_all_products({"category": category} if category else None)
         
         # Display results
         if filtered_products:
@@ -206,7 +206,7 @@ def show():
                     'Quantity': p.get('stock', 0),
                     'Unit': p.get('unit', 'pcs'),
                     'Price': f"₹{p.get('price', 0.0):,.2f}",
-                    'Status': '⚠️ Low Stock' if p.get('stock', 0) <= p.get('reorder_level', 10) else '✅ In Stock'
+                    'Status': '⚠️ Low Stock' if p.get('stock', 0) <= p.get('reorder_point', p.get('reorder_level', 10)) else '✅ In Stock'
                 })
             
             df = pd.DataFrame(products_data)
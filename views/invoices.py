@@ -121,7 +121,7 @@ def show():
                     with col1:
                         # Use session state to allow clearing, but unique key to avoid conflicts
                         invoice_number = st.text_input("Invoice Number", 
-                                                      value=f"INV-{datetime.now().strftime('%Y%m%d')}-{len(orders)}",
+                                                      placeholder="Auto-generated",
                                                       key="so_inv_num")
                         invoice_date = st.date_input("Invoice Date", datetime.now(), key="so_inv_date")
                     with col2:
@@ -137,8 +137,9 @@ def show():
                     
                     def on_invoice_submit():
                         from models.invoice import Invoice
+                        invoice_number = st.session_state.so_inv_num.strip() or Invoice.generate_invoice_number()
                         inv_id = Invoice.create_invoice(
-                            invoice_number=st.session_state.so_inv_num,
+                            invoice_number=invoice_number,
                             customer_name=selected_so['customer_name'],
                             invoice_date=st.session_state.so_inv_date,
                             due_date=st.session_state.so_due_date,
@@ -149,7 +150,7 @@ def show():
                             sales_order_id=selected_so['_id'],
                             created_by=st.session_state.user['id'] if st.session_state.user else None
                         )
-                        st.session_state.invoice_success = f"Invoice {st.session_state.so_inv_num} generated from Sales Order!"
+                        st.session_state.invoice_success = f"Invoice {invoice_number} generated from Sales Order!"
                         
                         # Clear form fields
                         keys_to_clear = ["so_inv_num", "so_notes", "so_tax_rate", "so_selector"]
@@ -183,7 +184,7 @@ def show():
             with st.form("create_invoice_manual"):
                 col1, col2 = st.columns(2)
                 with col1:
-                    invoice_number = st.text_input("Invoice Number", value=f"INV-{datetime.now().strftime('%Y%m%d')}", key="manual_inv_num")
+                    invoice_number = st.text_input("Invoice Number", placeholder="Auto-generated", key="manual_inv_num")
                     customer_name = st.text_input("Customer Name", key="manual_cust_name")
                 with col2:
                     invoice_date = st.date_input("Invoice Date", datetime.now(), key="manual_inv_date")
@@ -198,8 +199,9 @@ def show():
                         return
 
                     from models.invoice import Invoice
+                    invoice_number = st.session_state.manual_inv_num.strip() or Invoice.generate_invoice_number()
                     Invoice.create_invoice(
-                        invoice_number=st.session_state.manual_inv_num,
+                        invoice_number=invoice_number,
                         customer_name=st.session_state.manual_cust_name,
                         invoice_date=st.session_state.manual_inv_date,
                         due_date=st.session_state.manual_due_date,
@@ -211,7 +213,7 @@ def show():
                     )
                     st.session_state.inv_items = []
 
-                    st.session_state.invoice_success = f"Invoice {st.session_state.manual_inv_num} created successfully!"
+                    st.session_state.invoice_success = f"Invoice {invoice_number} created successfully!"
                     
                     # Clear form fields by removing them from session state
                     keys_to_clear = ["manual_inv_num", "manual_cust_name", "manual_notes", "manual_tax_rate"]
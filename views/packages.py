@@ -9,24 +9,58 @@ def show():
     # Tabs for different views
     tab1, tab2 = st.tabs(["All Packages", "Create Package"])
     
+def format_age(moment):
+    """Human readable age of a timestamp"""
+    minutes = int((datetime.now() - moment).total_seconds() // 60)
+    if minutes < 1:
+        return "just now"
+    if minutes < 60:
+        return f"{minutes} min ago"
+    if minutes < 24 * 60:
+        return f"{minutes // 60} h ago"
+    return f"{minutes // (24 * 60)} days ago"
+
 @st.dialog("Tracking Details")
 def show_tracking_details(package, tracking_info):
     """Display tracking details in a dialog"""
+    from models.package import Package
+    from services.tracking_poller import TrackingPoller
+    
     st.subheader(f"Tracking: {package.get('tracking_number', 'N/A')}")
     st.caption(f"Carrier: {package.get('carrier', 'Unknown')}")
     
     status_color = "green" if tracking_info['status'] == "Delivered" else "blue"
     st.markdown(f"### Status: :{status_color}[{tracking_info['status']}]")
     
+    age = format_age(tracking_info['fetched_at'])
+    if tracking_info.get('is_stale'):
+        st.caption(f"🕒 Data from {age} - refreshing in the background")
+    else:
+        st.caption(f"🕒 Data from {age}")
+    if tracking_info.get('estimated_delivery') not in (None, "N/A"):
+        st.caption(f"Estimated delivery: {tracking_info['estimated_delivery']}")
+    
     if tracking_info.get('is_mock'):
         st.warning("⚠️ Using mock data. Add `TRACKING_API_KEY` to .env for real updates.")
     
+    if st.button("🔄 Refresh Now", key=f"refresh_{package['_id']}"):
+        TrackingPoller().poll_packages([package], force=True)
+        st.rerun()
+    
+    events = Package.get_events(package['_id'], limit=20)
+    if events:
+        st.markdown("### 📋 Recorded Updates")
+        for event in events:
+            location = f" ({event['location']})" if event.get('location') else ""
+            st.caption(f"{event['timestamp'].strftime('%Y-%m-%d %H:%M')} - **{event['status']}**{location}")
+    
     st.markdown("### 🕒 History")
     for event in tracking_info.get('history', []):
         with st.container():
             c1, c2 = st.columns([1, 3])
-            c1.caption(event['timestamp'])
-            c2.write(f"**{event['status']}** - {event['details']}")
+            timestamp = event['timestamp']
+            c1.caption(timestamp.strftime('%Y-%m-%d %H:%M') if hasattr(timestamp, 'strftime') else str(timestamp))
+            c2.write(f"**{event['status']}** - {event.get('details') or ''}")
             st.divider()
 
 def show():
@@ -40,15 +74,15 @@ def show():
         st.subheader("Package Tracking")
         
         from models.package import Package
-        from services.tracking_service import TrackingService
+        from services.tracking_cache import TrackingCache
         
-        packages = Package.get_all_packages()
+        status_counts = Package.get_status_counts()
         
-        if packages:
+        if status_counts:
             # Metrics
-            total = len(packages)
-            delivered = sum(1 for p in packages if p['status'] == 'Delivered')
-            transit = sum(1 for p in packages if p['status'] == 'In Transit')
+            total = sum(status_counts.values())
+            delivered = status_counts.get('Delivered', 0)
+            transit = status_counts.get('In Transit', 0)
             pending = total - delivered - transit
             
             col1, col2, col3, col4 = st.columns(4)
@@ -59,6 +93,18 @@ def show():
             
             st.markdown("---")
             
+            status_filter = st.selectbox("Status", ["All"] + sorted(s for s in status_counts if s))
+            
+            # Cursor stack for keyset paging; reset when the filter changes
+            if st.session_state.get('pkg_status_filter') != status_filter:
+                st.session_state.pkg_status_filter = status_filter
+                st.session_state.pkg_cursors = [None]
+            
+            packages, next_page = Package.list_packages(
+                status=None if status_filter == "All" else status_filter,
+                after=st.session_state.pkg_cursors[-1]
+            )
+            
             # Package List
             for pkg in packages:
                 tracking_num = pkg.get('tracking_number', 'N/A')
@@ -77,10 +123,19 @@ def show():
                     
                     if c3.button("🛰️ Track", key=f"track_{pkg['_id']}"):
                         try:
-                            tracking_info = TrackingService.get_tracking_info(tracking_num, carrier_name)
+                            tracking_info = TrackingCache.get_tracking_info(tracking_num, carrier_name)
                             show_tracking_details(pkg, tracking_info)
                         except Exception as e:
                             st.error(f"Tracking Error: {e}")
+            
+            p1, p2, p3 = st.columns([1, 2, 1])
+            if p1.button("⬅️ Previous", disabled=len(st.session_state.pkg_cursors) == 1):
+                st.session_state.pkg_cursors.pop()
+                st.rerun()
+            p2.caption(f"Page {len(st.session_state.pkg_cursors)}")
+            if p3.button("Next ➡️", disabled=next_page is None):
+                st.session_state.pkg_cursors.append(next_page)
+                st.rerun()
         else:
             st.info("No packages found. Add a package to start tracking.")
     
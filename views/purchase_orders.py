@@ -44,9 +44,19 @@ def show_po_details(po):
     if po['status'] != 'Received':
         if st.button("Mark as Received", key=f"r_{po['_id']}"):
             from models.purchase_order import PurchaseOrder
-            PurchaseOrder.update_status(po['_id'], "Received")
-            # TODO: Add logic to update stock levels here
-            st.success("Order marked as Received!")
+            
+            try:
+                result = PurchaseOrder.receive(po['_id'])
+            except Exception as e:
+                st.error(f"Could not receive stock: {e}")
+                return
+            if result is None:
+                st.session_state.po_success = f"PO {po['po_number']} was already received"
+            elif result['missing']:
+                st.session_state.po_success = (f"Order marked as Received! Skipped deleted "
+                                               f"product(s): {', '.join(result['missing'])}")
+            else:
+                st.session_state.po_success = "Order marked as Received!"
             st.rerun()
 
 def show():
@@ -109,7 +119,7 @@ def show():
             # 2. Add Items
             st.markdown("#### Add Items")
             from models.product import Product
-            products = Product.get_all_products()
+            products, _ = Product.list_products(fields=["name", "cost"])
             prod_opts = {p['name']: p for p in products}
             
             c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
@@ -151,7 +161,7 @@ def show():
             with st.form("create_po_form"):
                 c1, c2 = st.columns(2)
                 with c1:
-                    po_number = st.text_input("PO Number", value=f"PO-{datetime.now().strftime('%Y%m%d')}-{len(pos)+1}", key="po_num")
+                    po_number = st.text_input("PO Number", placeholder="Auto-generated", key="po_num")
                     order_date = st.date_input("Order Date", datetime.now(), key="po_date")
                     
                 with c2:
@@ -167,8 +177,9 @@ def show():
                         return
                     
                     from models.purchase_order import PurchaseOrder
+                    po_number = st.session_state.po_num.strip() or PurchaseOrder.generate_po_number()
                     PurchaseOrder.create_po(
-                        po_number=st.session_state.po_num,
+                        po_number=po_number,
                         supplier_id=supp_opts[st.session_state.po_supp_select]['_id'],
                         supplier_name=st.session_state.po_supp_select,
                         order_date=st.session_state.po_date,
@@ -179,7 +190,7 @@ def show():
                         created_by=st.session_state.user['id'] if st.session_state.user else None
                     )
                     
-                    st.session_state.po_success = f"Purchase Order {st.session_state.po_num} Created!"
+                    st.session_state.po_success = f"Purchase Order {po_number} Created!"
                     
                     # Clear state
                     st.session_state.po_items = []
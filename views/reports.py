@@ -1,7 +1,7 @@
 
 import streamlit as st
 from models.product import Product
-from models.bill import Bill
+from services.report_service import ReportService
 from datetime import datetime, timedelta
 import pandas as pd
 import plotly.express as px
@@ -26,15 +26,15 @@ def show():
     
     st.markdown("---")
     
-    # Get data
-    products = Product.get_all_products()
-    bills = Bill.get_bills_by_date_range(start_datetime, end_datetime)
+    # Get data (aggregated server-side)
+    summary = ReportService.get_sales_summary(start_datetime, end_datetime)
+    valuation = ReportService.get_inventory_valuation()
     
     # Calculate metrics
-    total_sales = sum(bill['total'] for bill in bills)
-    total_bills_count = len(bills)
+    total_sales = summary['total_sales']
+    total_bills_count = summary['bill_count']
     avg_bill_value = total_sales / total_bills_count if total_bills_count > 0 else 0
-    total_items_sold = sum(sum(item['quantity'] for item in bill['items']) for bill in bills)
+    total_items_sold = summary['items_sold']
     
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -60,16 +60,12 @@ def show():
         # Sales trend
         st.subheader("📊 Sales Trend")
         
-        if bills:
-            # Group by date
-            daily_sales = {}
-            for bill in bills:
-                date_key = bill['created_at'].strftime('%Y-%m-%d')
-                daily_sales[date_key] = daily_sales.get(date_key, 0) + bill['total']
-            
+        daily_sales = ReportService.get_daily_sales(start_datetime, end_datetime)
+        
+        if daily_sales:
             sales_df = pd.DataFrame([
-                {'Date': date, 'Sales': amount}
-                for date, amount in sorted(daily_sales.items())
+                {'Date': row['date'], 'Sales': row['sales']}
+                for row in daily_sales
             ])
             
             fig = px.line(sales_df, x='Date', y='Sales', 
@@ -84,18 +80,14 @@ def show():
         # Top selling products
         st.subheader("🏆 Top Selling Products")
         
-        if bills:
-            product_sales = {}
-            for bill in bills:
-                for item in bill['items']:
-                    product_name = item['name']
-                    product_sales[product_name] = product_sales.get(product_name, 0) + item['quantity']
-            
-            # Sort and get top 10
-            top_products = sorted(product_sales.items(), key=lambda x: x[1], reverse=True)[:10]
+        if total_bills_count:
+            top_products = ReportService.get_top_products(start_datetime, end_datetime, limit=10)
             
             if top_products:
-                top_df = pd.DataFrame(top_products, columns=['Product', 'Quantity Sold'])
+                top_df = pd.DataFrame([
+                    {'Product': row['name'], 'Quantity Sold': row['quantity']}
+                    for row in top_products
+                ])
                 
                 fig = px.bar(top_df, x='Quantity Sold', y='Product', 
                             orientation='h',
@@ -109,26 +101,17 @@ def show():
     # Revenue by category
     st.subheader("💰 Revenue by Category")
     
-    if bills and products:
-        category_revenue = {}
-        
-        for bill in bills:
-            for item in bill['items']:
-                # Find product to get category
-                product = next((p for p in products if p['name'] == item['name']), None)
-                if product:
-                    category = product.get('category', 'Uncategorized')
-                    category_revenue[category] = category_revenue.get(category, 0) + item['total']
+    category_revenue = ReportService.get_category_revenue(start_datetime, end_datetime) if total_bills_count else []
+    
+    if category_revenue:
+        cat_df = pd.DataFrame([
+            {'Category': row['category'], 'Revenue': row['revenue']}
+            for row in category_revenue
+        ])
         
-        if category_revenue:
-            cat_df = pd.DataFrame([
-                {'Category': cat, 'Revenue': rev}
-                for cat, rev in category_revenue.items()
-            ])
-            
-            fig = px.pie(cat_df, values='Revenue', names='Category',
-                        title='Revenue Distribution by Category')
-            st.plotly_chart(fig, use_container_width=True)
+        fig = px.pie(cat_df, values='Revenue', names='Category',
+                    title='Revenue Distribution by Category')
+        st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No revenue data available")
     
@@ -137,13 +120,13 @@ def show():
     # Inventory valuation
     st.subheader("📦 Inventory Valuation")
     
-    if products:
+    if valuation['by_category']:
         col1, col2 = st.columns(2)
         
         with col1:
             # Total inventory value
-            total_value = sum(p.get('stock', 0) * p['price'] for p in products)
-            total_cost = sum(p.get('stock', 0) * p['cost'] for p in products)
+            total_value = valuation['total_value']
+            total_cost = valuation['total_cost']
             potential_profit = total_value - total_cost
             
             st.metric("Total Inventory Value", f"₹{total_value:,.2f}")
@@ -152,14 +135,9 @@ def show():
         
         with col2:
             # Category-wise valuation
-            category_value = {}
-            for p in products:
-                cat = p.get('category', 'Uncategorized')
-                category_value[cat] = category_value.get(cat, 0) + (p.get('stock', 0) * p['price'])
-            
             val_df = pd.DataFrame([
-                {'Category': cat, 'Value': val}
-                for cat, val in category_value.items()
+                {'Category': row['category'], 'Value': row['value']}
+                for row in valuation['by_category']
             ])
             
             fig = px.bar(val_df, x='Category', y='Value',
@@ -169,21 +147,79 @@ def show():
     else:
         st.info("No inventory data available")
     
+    # Point-in-time valuation from the stock ledger
+    with st.expander("🕰️ Valuation As Of Date"):
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            as_of_date = st.date_input("As of", end_date, key="valuation_as_of")
+        with col2:
+            method = st.selectbox("Method", ["FIFO", "weighted_avg"],
+                                  format_func=lambda m: "FIFO" if m == "FIFO" else "Weighted Average")
+        with col3:
+            st.write("")
+            st.write("")
+            run_valuation = st.button("Calculate", use_container_width=True)
+        
+        if run_valuation:
+            from services.inventory_valuation import InventoryValuation
+            with st.spinner("Replaying stock ledger..."):
+                historical = InventoryValuation.as_of(as_of_date, method=method)
+            
+            c1, c2 = st.columns(2)
+            c1.metric("Inventory Value (at cost)", f"₹{historical['total_value']:,.2f}")
+            c2.metric("Units On Hand", f"{historical['total_quantity']:,}")
+            if historical['by_category']:
+                st.dataframe(pd.DataFrame([
+                    {'Category': row['category'], 'Units': row['quantity'], 'Value': f"₹{row['value']:,.2f}"}
+                    for row in historical['by_category']
+                ]), use_container_width=True, hide_index=True)
+
+    # Demand forecast from the sales rollup
+    with st.expander("🔮 Demand Forecast"):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            horizon = st.slider("Forecast horizon (days)", 7, 90, 30, key="forecast_horizon")
+        with col2:
+            st.write("")
+            st.write("")
+            run_forecast = st.button("Forecast", use_container_width=True)
+
+        if run_forecast:
+            from utils.analytics import forecast_from_history
+            with st.spinner("Forecasting demand..."):
+                forecast = forecast_from_history(horizon=horizon)
+
+            if forecast.empty:
+                st.info("No sales history available for forecasting")
+            else:
+                products, _ = Product.list_products(fields=["name", "sku", "stock"])
+                catalog = {str(p['_id']): p for p in products}
+                st.dataframe(pd.DataFrame([
+                    {
+                        'Product': catalog.get(pid, {}).get('name', 'Unknown Product'),
+                        'SKU': catalog.get(pid, {}).get('sku', '-'),
+                        'In Stock': catalog.get(pid, {}).get('stock', 0),
+                        'Daily Avg (28d)': round(float(row['recent_daily_avg']), 2),
+                        'Busiest Day': row['peak_weekday'] if pd.notna(row['peak_weekday']) else '-',
+                        f'Forecast ({horizon}d)': row['forecast']
+                    }
+                    for pid, row in forecast.head(50).iterrows()
+                ]), use_container_width=True, hide_index=True)
+
     st.markdown("---")
     
     # Stock movement
     st.subheader("📊 Stock Movement Analysis")
     
-    stock_movements = Product.get_stock_movements(limit=100)
+    stock_movements = Product.get_stock_movements(limit=100, include_product=True)
     
     if stock_movements:
         movements_data = []
         for movement in stock_movements:
-            product = Product.get_product_by_id(str(movement['product_id']))
-            if product:
+            if movement.get('product_name'):
                 movements_data.append({
                     'Date': movement['timestamp'].strftime('%Y-%m-%d %H:%M'),
-                    'Product': product['name'],
+                    'Product': movement['product_name'],
                     'Type': movement['movement_type'],
                     'Change': movement['quantity_change'],
                     'Notes': movement.get('notes', '')
@@ -202,6 +238,7 @@ def show():
     col1, col2, col3 = st.columns(3)
     
     with col1:
+        bills = ReportService.get_bills_export(start_datetime, end_datetime) if total_bills_count else []
         if bills:
             bills_export = pd.DataFrame([{
                 'Bill Number': b['bill_number'],
@@ -221,14 +258,15 @@ def show():
             )
     
     with col2:
+        products = ReportService.get_inventory_export()
         if products:
             products_export = pd.DataFrame([{
                 'SKU': p['sku'],
                 'Name': p['name'],
                 'Category': p['category'],
-                'Quantity': p.get('stock', 0),
+                'Quantity': p.get('stock', p.get('quantity', 0)),
                 'Price': p['price'],
-                'Value': p.get('stock', 0) * p['price']
+                'Value': p.get('stock', p.get('quantity', 0)) * p['price']
             } for p in products])
             
             csv = products_export.to_csv(index=False)
@@ -71,7 +71,7 @@ def show():
                 customer_name = st.text_input("Customer Name")
                 order_date = st.date_input("Order Date", datetime.now())
             with col2:
-                order_number = st.text_input("Order Number", f"SO-{datetime.now().strftime('%Y%m%d')}")
+                order_number = st.text_input("Order Number", placeholder="Auto-generated")
                 delivery_date = st.date_input("Expected Delivery")
 
         st.markdown("---")
@@ -81,7 +81,7 @@ def show():
         
         # Get products
         from models.product import Product
-        products = Product.get_all_products()
+        products, _ = Product.list_products(fields=["name", "sku", "stock", "price"])
         product_options = [""] + [f"{p['name']} - {p['sku']} (Stock: {p.get('stock', 0)})" for p in products]
 
         if products:
@@ -161,6 +161,7 @@ def show():
             else:
                 try:
                     from models.sales_order import SalesOrder
+                    order_number = order_number.strip() or SalesOrder.generate_order_number()
                     
                     # Create order in DB
                     order_id = SalesOrder.create_order(